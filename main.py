@@ -1,12 +1,27 @@
+import argparse
 import asyncio
+import os
+import random
 import sys
+from typing import TYPE_CHECKING
 
 from src.app import App
 
+if TYPE_CHECKING:
+    from src.recording import Recorder
+    from src.window.inputs_map import Inputs
+
 SCREEN_SIZE = 1600, 900
 is_web = sys.platform in ("emscripten", "wasi")
 
 
+def hold_space(frame: int) -> "tuple[Inputs, ...]":
+    """Scripted input for unattended runs: start, then keep shooting."""
+    from src.window.inputs_map import Inputs
+
+    return (Inputs.Space,) if frame > 0 else ()
+
+
 def run_pyscript() -> None:
     """`python -m scripts.create_pyscript_toml | python -m http.server -d .`"""
     from webwindow import WebWindow  # type: ignore
@@ -18,18 +33,153 @@ def run_pyscript() -> None:
     asyncio.create_task(App(window, audio).start())
 
 
-def run_native():
-    """`python -m main`"""
+def parse_seed(text: str) -> int:
+    """Recordings store the seed as an unsigned 64-bit integer."""
+    seed = int(text)
+    if not 0 <= seed < 2**64:
+        raise argparse.ArgumentTypeError(f"seed must be in [0, 2**64), got {seed}")
+    return seed
+
+
+def add_recording_args(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--record", default="", help="write the run to this file")
+    parser.add_argument("--seed", type=parse_seed, default=None)
+
+
+def create_recorder(
+    options: argparse.Namespace, step_rate: float
+) -> "tuple[int, Recorder | None]":
+    """Picks the run's seed and, with `--record`, opens its recording."""
+    from src.recording import Recorder
+
+    seed = options.seed if options.seed is not None else random.getrandbits(63)
+    if not options.record:
+        return seed, None
+    return seed, Recorder(options.record, seed, step_rate, SCREEN_SIZE)
+
+
+def run_native(args: list[str]) -> None:
+    """`python -m main [--record run.rec] [--seed N]`"""
     from src.window.audio.pygame_audio import PygameAudio
     from src.window.pygame_window import PygameWindow
 
+    parser = argparse.ArgumentParser(prog="python -m main")
+    add_recording_args(parser)
+    options = parser.parse_args(args)
+
+    seed, recorder = create_recorder(options, 120.0)
     window = PygameWindow(*SCREEN_SIZE)
     audio = PygameAudio()
-    asyncio.run(App(window, audio).start())
+    asyncio.run(App(window, audio, seed=seed, recorder=recorder).start())
+
+
+def run_headless(args: list[str]) -> None:
+    """`python -m main --headless [--frames N] [--step-rate 120] [--capture 60]`
+
+    Renders offscreen, holding Space from the second frame on like `--simulate`.
+    """
+    from src.rendering.renderer import Renderer
+    from src.window.audio.pygame_audio import PygameAudio
+    from src.window.headless_window import HeadlessWindow
+
+    parser = argparse.ArgumentParser(prog="python -m main --headless")
+    parser.add_argument("--frames", type=int, default=600)
+    parser.add_argument("--frame-time", type=float, default=1 / 60)
+    parser.add_argument("--step-rate", type=float, default=120.0)
+    parser.add_argument("--capture", default="")
+    parser.add_argument("--capture-dir", default="captures")
+    parser.add_argument("--format", choices=("png", "npy"), default="png")
+    options = parser.parse_args(args)
+
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    window = HeadlessWindow(
+        *SCREEN_SIZE,
+        num_frames=options.frames,
+        frame_time=options.frame_time,
+        capture_frames=[int(frame) for frame in options.capture.split(",") if frame],
+        capture_dir=options.capture_dir,
+        capture_format=options.format,
+        inputs=hold_space,
+    )
+    audio = PygameAudio()
+    renderer = Renderer(window)
+    window.framebuffer = renderer.fbo
+    app = App(
+        window,
+        audio,
+        wait_for_assets=True,
+        step_rate=options.step_rate,
+        renderer=renderer,
+    )
+    asyncio.run(app.start())
+    print(
+        f"{window.frame} frames in {window.elapsed:.2f} s "
+        f"({window.elapsed / max(window.frame, 1) * 1000:.2f} ms/frame)"
+    )
+
+
+def run_simulation(args: list[str]) -> None:
+    """`python -m main --simulate [--frames N] [--step-rate 120] [--record run.rec]`
+
+    Runs only the game logic, with no window, GL or audio, holding Space from
+    the second frame on (start, then keep shooting).
+    """
+    from src.simulation import simulate
+
+    parser = argparse.ArgumentParser(prog="python -m main --simulate")
+    parser.add_argument("--frames", type=int, default=6000)
+    parser.add_argument("--frame-time", type=float, default=1 / 60)
+    parser.add_argument("--step-rate", type=float, default=120.0)
+    add_recording_args(parser)
+    options = parser.parse_args(args)
+
+    seed, recorder = create_recorder(options, options.step_rate)
+    result = simulate(
+        options.frames,
+        hold_space,
+        frame_time=options.frame_time,
+        step_rate=options.step_rate,
+        size=SCREEN_SIZE,
+        seed=seed,
+        recorder=recorder,
+    )
+    print(
+        f"{result.frames} frames in {result.elapsed:.2f} s ({result.fps:.0f} fps), "
+        f"score {result.scene.score}"
+    )
+
+
+def run_replay(args: list[str]) -> None:
+    """`python -m main --replay run.rec`
+
+    Replays a recorded run uncapped and checks that every frame reproduces
+    the recorded state.
+    """
+    from src.recording import Recording
+    from src.simulation import run_replay as replay
+
+    parser = argparse.ArgumentParser(prog="python -m main --replay")
+    parser.add_argument("path")
+    options = parser.parse_args(args)
+
+    result = replay(Recording.load(options.path))
+    print(
+        f"{result.frames} frames in {result.elapsed:.2f} s ({result.fps:.0f} fps), "
+        f"score {result.scene.score}"
+    )
+    if result.mismatch is not None:
+        sys.exit(f"state differs from the recording from frame {result.mismatch}")
+    print("replay matches the recording")
 
 
 if __name__ == "__main__":
     if is_web:
         run_pyscript()
+    elif "--headless" in sys.argv:
+        run_headless([arg for arg in sys.argv[1:] if arg != "--headless"])
+    elif "--simulate" in sys.argv:
+        run_simulation([arg for arg in sys.argv[1:] if arg != "--simulate"])
+    elif "--replay" in sys.argv:
+        run_replay([arg for arg in sys.argv[1:] if arg != "--replay"])
     else:
-        run_native()
+        run_native(sys.argv[1:])
@@ -0,0 +1,32 @@
+"""`python -m scripts.bake_assets [--compress]`
+
+Bakes the textures built by `Textures.build` (scaled and colorkeyed images,
+intro panel text, font glyphs) into the texture pack that `Textures` loads at
+startup.
+"""
+
+import argparse
+import os
+
+os.environ["PYGAME_HIDE_SUPPORT_PROMPT"] = "1"
+
+import pygame
+
+from src.rendering.textures import TEXTURE_PACK_PATH, Textures, save_texture_pack
+
+
+def bake_texture_pack(path: str = TEXTURE_PACK_PATH, compress: bool = False) -> None:
+    pygame.init()
+    data = Textures.build()
+    save_texture_pack(path, data, compress)
+    print(f"Wrote {path} ({os.path.getsize(path) / 1024 / 1024:.1f} MiB)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="python -m scripts.bake_assets")
+    parser.add_argument(
+        "--compress",
+        action="store_true",
+        help="zlib-compress the layers (smaller download, no memory mapping)",
+    )
+    bake_texture_pack(compress=parser.parse_args().compress)
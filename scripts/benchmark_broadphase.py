@@ -0,0 +1,88 @@
+"""`python -m scripts.benchmark_broadphase [--counts 250,1000,4000] [--repeats N]`
+
+Times finding the overlapping projectile and obstacle boxes with the uniform
+grid and with a brute-force test of every pair, for growing numbers of
+obstacles and projectiles. The field is as wide as the play field and grows
+in height with the count, as if the boxes streamed through it, so the number
+of overlaps per box stays about the same.
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from src.broadphase import UniformGrid
+
+PLAY_FIELD = 200.0, 0.0, 1200.0, 900.0
+# Boxes per play field height.
+DENSITY = 250
+
+
+def random_boxes(
+    rng: np.random.Generator,
+    field: tuple[float, float, float, float],
+    count: int,
+    size: tuple[float, float],
+) -> np.ndarray:
+    x, y, w, h = field
+    boxes = np.empty((count, 4))
+    boxes[:, 0] = rng.uniform(x, x + w - size[0], count)
+    boxes[:, 1] = rng.uniform(y, y + h - size[1], count)
+    boxes[:, 2:] = size
+    return boxes
+
+
+def brute_force(a: np.ndarray, b: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    first, second = np.nonzero(
+        (a[:, None, 0] < b[None, :, 0] + b[None, :, 2])
+        & (a[:, None, 0] + a[:, None, 2] > b[None, :, 0])
+        & (a[:, None, 1] < b[None, :, 1] + b[None, :, 3])
+        & (a[:, None, 1] + a[:, None, 3] > b[None, :, 1])
+    )
+    return first, second
+
+
+def grid(
+    index: UniformGrid, a: np.ndarray, b: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    index.insert(b)
+    return index.query(a)
+
+
+def best_time(repeats: int, find_pairs, *args) -> float:
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        find_pairs(*args)
+        times.append(time.perf_counter() - start)
+    return min(times) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m scripts.benchmark_broadphase")
+    parser.add_argument("--counts", default="250,1000,2000,4000,8000")
+    parser.add_argument("--repeats", type=int, default=5)
+    options = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"{'count':>6} {'pairs':>7} {'grid ms':>9} {'brute ms':>9}")
+    for count in map(int, options.counts.split(",")):
+        x, y, w, h = PLAY_FIELD
+        field = x, y, w, h * max(1.0, count / DENSITY)
+        # Obstacles are 64-150 px, projectiles 10x30 px.
+        obstacles = random_boxes(rng, field, count, (150.0, 150.0))
+        obstacles[:, 2:] = rng.uniform(64, 150, (count, 2))
+        projectiles = random_boxes(rng, field, count, (10.0, 30.0))
+        index = UniformGrid(field)
+        pairs = grid(index, projectiles, obstacles)
+        expected = brute_force(projectiles, obstacles)
+        assert all(np.array_equal(x, y) for x, y in zip(pairs, expected))
+        repeats = options.repeats
+        grid_time = best_time(repeats, grid, index, projectiles, obstacles)
+        brute_time = best_time(repeats, brute_force, projectiles, obstacles)
+        print(f"{count:>6} {pairs[0].size:>7} {grid_time:>9.2f} {brute_time:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
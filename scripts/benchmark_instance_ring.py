@@ -0,0 +1,83 @@
+"""`python -m scripts.benchmark_instance_ring [--sprites N] [--frames N]`
+
+Renders a scene of moving sprites offscreen with instance ring depth 1 and 3
+and prints the frame time statistics of each run.
+"""
+
+import argparse
+import random
+import time
+
+import numpy as np
+
+from src.entities.sprite import Sprite
+from src.rendering.renderer import Renderer
+from src.rendering.textures import Textures
+from src.window.headless_window import HeadlessWindow
+
+SCREEN_SIZE = 1600, 900
+
+
+def benchmark(
+    window: HeadlessWindow,
+    textures: Textures,
+    ring_depth: int,
+    num_sprites: int,
+    num_frames: int,
+) -> np.ndarray:
+    renderer = Renderer(
+        window,
+        expected_instances={"default": 2 * num_sprites, "translucent": 16, "font": 16},
+        instance_ring_depth=ring_depth,
+    )
+    renderer.set_textures(textures)
+    render_group = renderer.render_groups["default"]
+    regions = [textures.atlas[f"obstacle_texture_{i}"] for i in range(7)]
+    random.seed(0)
+    for _ in range(num_sprites):
+        Sprite(
+            render_group=render_group,
+            pos=(random.uniform(0, SCREEN_SIZE[0]), random.uniform(0, SCREEN_SIZE[1])),
+            size=(32, 32),
+            region=random.choice(regions),
+            depth=random.uniform(1, 10),
+        )
+    frame_times = np.zeros(num_frames)
+    for frame in range(num_frames):
+        # Every instance moves every frame, the worst case for uploads. The
+        # rows are updated in bulk so the timing is dominated by rendering.
+        rows = render_group.instance_data[:num_sprites]
+        rows[:, 1] = (rows[:, 1] + 1) % SCREEN_SIZE[1]
+        render_group.dirty[:num_sprites] = True
+        start = time.perf_counter()
+        renderer.render()
+        frame_times[frame] = time.perf_counter() - start
+        window.frame += 1
+    render_group.clear()
+    return frame_times
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m scripts.benchmark_instance_ring")
+    parser.add_argument("--sprites", type=int, default=20000)
+    parser.add_argument("--frames", type=int, default=300)
+    options = parser.parse_args()
+
+    window = HeadlessWindow(*SCREEN_SIZE)
+    textures = Textures()
+    for ring_depth in (1, 3):
+        frame_times = benchmark(
+            window, textures, ring_depth, options.sprites, options.frames
+        )
+        # The first frames include pipeline creation and the initial uploads.
+        frame_times = frame_times[len(frame_times) // 10 :] * 1000
+        p50, p95, p99 = np.percentile(frame_times, (50, 95, 99))
+        print(
+            f"ring depth {ring_depth}: {options.sprites} sprites, "
+            f"mean {frame_times.mean():.2f} ms, p50 {p50:.2f} ms, "
+            f"p95 {p95:.2f} ms, p99 {p99:.2f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""`python -m scripts.benchmark_obstacles [--obstacles N] [--frames N]`
+
+Runs the scene's obstacle update over a large field of obstacles, with a
+share of them destroyed and respawned every frame, and prints the update and
+render times.
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from src.rendering.renderer import Renderer
+from src.rendering.textures import Textures
+from src.scene import Scene
+from src.window.headless_window import HeadlessWindow
+
+SCREEN_SIZE = 1600, 900
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m scripts.benchmark_obstacles")
+    parser.add_argument("--obstacles", type=int, default=10000)
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--kill-rate", type=float, default=0.01)
+    options = parser.parse_args()
+
+    window = HeadlessWindow(*SCREEN_SIZE)
+    renderer = Renderer(
+        window,
+        expected_instances={
+            "default": 2 * options.obstacles,
+            "translucent": 64,
+            "font": 1024,
+        },
+    )
+    renderer.set_textures(Textures())
+    # No sounds: the scene skips the ones it does not have.
+    scene = Scene(renderer, audio=None, sfx={}, seed=0)  # type: ignore[arg-type]
+    scene.intro_panel_active = False
+    for _ in range(options.obstacles):
+        scene.add_obstacle()
+    health = renderer.render_groups["default"].entities.health
+    update_times = np.zeros(options.frames)
+    render_times = np.zeros(options.frames)
+    for frame in range(options.frames):
+        scene.time += window.frame_time
+        renderer.motion_time = scene.time
+        slots = np.fromiter(scene.obstacles, dtype=np.int64)
+        killed = slots[np.random.random(slots.size) < options.kill_rate]
+        health[killed] = 0
+        start = time.perf_counter()
+        scene.update_obstacles()
+        update_times[frame] = time.perf_counter() - start
+        while len(scene.obstacles) < options.obstacles:
+            scene.add_obstacle()
+        start = time.perf_counter()
+        renderer.render()
+        render_times[frame] = time.perf_counter() - start
+        window.frame += 1
+
+    for name, times in (("update_obstacles", update_times), ("render", render_times)):
+        times = times[len(times) // 10 :] * 1000
+        p50, p95 = np.percentile(times, (50, 95))
+        print(
+            f"{name}: {options.obstacles} obstacles, mean {times.mean():.2f} ms, "
+            f"p50 {p50:.2f} ms, p95 {p95:.2f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
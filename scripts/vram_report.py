@@ -0,0 +1,34 @@
+"""`python -m scripts.vram_report`
+
+Lists the dimensions, layers, mip levels and estimated video memory of every
+texture and render target the renderer allocates.
+"""
+
+import os
+
+os.environ["PYGAME_HIDE_SUPPORT_PROMPT"] = "1"
+
+from src.rendering.renderer import Renderer
+from src.rendering.textures import Textures
+from src.window.headless_window import HeadlessWindow
+
+SCREEN_SIZE = 1600, 900
+
+
+def main() -> None:
+    renderer = Renderer(HeadlessWindow(*SCREEN_SIZE))
+    renderer.set_textures(Textures())
+    report = renderer.memory_report()
+    print(f"{'texture':<12} {'size':>11} {'layers':>6} {'mips':>4} {'MiB':>8}")
+    for entry in report:
+        size = f"{entry.size[0]}x{entry.size[1]}"
+        print(
+            f"{entry.name:<12} {size:>11} {entry.layers:>6} "
+            f"{entry.mip_levels:>4} {entry.bytes / 1024 / 1024:>8.2f}"
+        )
+    total = sum(entry.bytes for entry in report)
+    print(f"{'total':<12} {'':>11} {'':>6} {'':>4} {total / 1024 / 1024:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
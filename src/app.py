@@ -1,30 +1,165 @@
 import os
-from typing import TYPE_CHECKING
+import time
+from functools import partial
+from typing import TYPE_CHECKING, Any
 
 os.environ["PYGAME_HIDE_SUPPORT_PROMPT"] = "1"
 
+from src.asset_loader import AssetLoader
 from src.rendering.renderer import Renderer
-from src.scene import Scene
+from src.rendering.textures import (
+    TEXTURE_PACK_PATH,
+    TextureData,
+    Textures,
+    load_texture_pack,
+)
+from src.scene import MUSIC, SOUNDS, Scene
 
 if TYPE_CHECKING:
     from webwindow import WebWindow  # type: ignore
 
+    from src.recording import FrameRecorder
+    from src.rendering.base import SceneRenderer
+    from src.window.audio.null_audio import NullAudio
     from src.window.audio.pygame_audio import PygameAudio
     from src.window.audio.web_audio import WebAudio
     from src.window.pygame_window import PygameWindow
+    from src.window.simulation_window import SimulationWindow
+
+
+# Slack when comparing the accumulated frame time with the step, so frame
+# times that are whole multiples of it do not alternate step counts.
+STEP_TOLERANCE = 1e-9
 
 
 class App:
+    """Runs the game, loading its assets in the background.
+
+    Frames start right away: the background is drawn until the textures are
+    uploaded, then the scene starts while the sounds are still decoding and
+    the intro panel shows the loading progress. `wait_for_assets` loads
+    everything up front instead, which keeps headless runs repeatable.
+
+    The game advances in fixed steps of 1 / `step_rate` seconds, as many as
+    the frame time adds up to but at most `max_steps` per frame; time beyond
+    that is dropped, so a long frame slows the game down instead of moving
+    everything by a large step. Frames are drawn between the last two steps.
+
+    `seed` seeds the scene's random numbers. A `recorder` sees every frame
+    once the scene exists, after its update; see `src.recording`.
+    """
+
     def __init__(
-        self, window: "PygameWindow | WebWindow", audio: "PygameAudio | WebAudio"
+        self,
+        window: "PygameWindow | WebWindow | SimulationWindow",
+        audio: "PygameAudio | WebAudio | NullAudio",
+        wait_for_assets: bool = False,
+        step_rate: float = 120.0,
+        max_steps: int = 8,
+        renderer: "SceneRenderer | None" = None,
+        seed: int | None = None,
+        recorder: "FrameRecorder | None" = None,
     ) -> None:
         self.window = window
-        self.renderer = Renderer(self.window)
-        self.scene = Scene(self.renderer, audio)
+        self.audio = audio
+        self.step_time = 1 / step_rate
+        self.max_steps = max_steps
+        self.accumulator = 0.0
+        self.renderer: SceneRenderer = renderer or Renderer(self.window)
+        self.seed = seed
+        self.recorder = recorder
+        self.scene: Scene | None = None
+        self.sfx: dict[str, Any] = {}
+        self.loader = AssetLoader()
+        self.load_assets()
+        if wait_for_assets:
+            self.loader.wait()
+
+    def load_assets(self) -> None:
+        self.loader.submit(
+            lambda: load_texture_pack(TEXTURE_PACK_PATH), self.on_texture_pack
+        )
+        for name, path in SOUNDS.items():
+            self.loader.submit(
+                partial(self.audio.load_sound, path),
+                partial(self.sfx.__setitem__, name),
+            )
+        for name, path in MUSIC.items():
+            self.loader.submit(
+                partial(self.audio.load_music, path),
+                partial(self.sfx.__setitem__, name),
+            )
+
+    def on_texture_pack(self, data: TextureData | None) -> None:
+        if data is not None:
+            self.on_textures_decoded(data)
+            return
+        # No usable pack: decode the source images in parallel and assemble
+        # the atlas once they are all in.
+        jobs = Textures.decode_jobs()
+        atlas_surfs: list[dict | None] = [None] * len(jobs)
+        font: list[tuple] = []
+
+        def on_ready() -> None:
+            ready = [surfs for surfs in atlas_surfs if surfs is not None]
+            if font and len(ready) == len(atlas_surfs):
+                merged = {name: surf for surfs in ready for name, surf in surfs.items()}
+                self.on_textures_decoded(Textures.assemble(merged, *font[0]))
+
+        def on_surfs(idx: int, surfs: dict) -> None:
+            atlas_surfs[idx] = surfs
+            on_ready()
+
+        def on_font(result: tuple) -> None:
+            font.append(result)
+            on_ready()
+
+        for idx, job in enumerate(jobs):
+            self.loader.submit(job, partial(on_surfs, idx))
+        self.loader.submit(Textures.load_font, on_font)
+
+    def on_textures_decoded(self, data: TextureData) -> None:
+        # GL uploads stay on the main thread.
+        self.renderer.load_textures(data)
+        self.scene = Scene(self.renderer, self.audio, self.sfx, self.seed)
 
     def run(self) -> None:
-        self.scene.update()
+        if not self.loader.done:
+            self.loader.poll()
+            if self.scene is not None:
+                self.scene.asset_progress = self.loader.progress
+        if self.scene is None:
+            self.renderer.render()
+            return
+        if self.renderer.stats.enabled:
+            start = time.perf_counter()
+            self.update(self.scene)
+            self.renderer.stats.update_time = time.perf_counter() - start
+        else:
+            self.update(self.scene)
+        if self.recorder is not None:
+            self.recorder.on_frame(self.window, self.scene)
         self.renderer.render()
 
+    def update(self, scene: Scene) -> None:
+        scene.update()
+        if scene.paused:
+            self.accumulator = 0.0
+            scene.interpolate(1.0)
+            return
+        self.accumulator += self.window.frame_time
+        steps = 0
+        while self.accumulator + STEP_TOLERANCE >= self.step_time:
+            if steps == self.max_steps:
+                self.accumulator %= self.step_time
+                break
+            scene.step(self.step_time)
+            self.accumulator -= self.step_time
+            steps += 1
+        scene.interpolate(min(max(self.accumulator / self.step_time, 0.0), 1.0))
+
     async def start(self) -> None:
         await self.window.on_render(self.run)
+        self.loader.shutdown()
+        if self.recorder is not None:
+            self.recorder.close()
@@ -0,0 +1,73 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable
+
+
+class AssetLoader:
+    """Decodes assets on a thread pool and hands them to the main thread.
+
+    `submit` queues a `job` (file reads, image and audio decoding) that runs
+    off the main thread. `poll`, called once per frame on the main thread,
+    passes the result of every finished job to its `on_ready` callback, which
+    is where GL uploads happen. Without thread support (e.g. in the browser)
+    one job runs per `poll` instead, so frames keep coming while loading.
+    """
+
+    def __init__(self, max_workers: int | None = None) -> None:
+        self.executor: ThreadPoolExecutor | None = ThreadPoolExecutor(max_workers)
+        try:
+            self.executor.submit(int).result()
+        except RuntimeError:
+            self.executor.shutdown(wait=False)
+            self.executor = None
+        self.pending: list[tuple[Future, Callable[[Any], None]]] = []
+        # Jobs waiting to run on the main thread when there are no threads.
+        self.queued: list[tuple[Callable[[], Any], Callable[[Any], None]]] = []
+        self.total = 0
+        self.completed = 0
+
+    @property
+    def threaded(self) -> bool:
+        return self.executor is not None
+
+    @property
+    def progress(self) -> float:
+        return self.completed / self.total if self.total else 1.0
+
+    @property
+    def done(self) -> bool:
+        return not self.pending and not self.queued
+
+    def submit(self, job: Callable[[], Any], on_ready: Callable[[Any], None]) -> None:
+        self.total += 1
+        if self.executor is not None:
+            self.pending.append((self.executor.submit(job), on_ready))
+        else:
+            self.queued.append((job, on_ready))
+
+    def poll(self) -> None:
+        if self.executor is None:
+            if self.queued:
+                job, on_ready = self.queued.pop(0)
+                self.complete(on_ready, job())
+            return
+        finished = [entry for entry in self.pending if entry[0].done()]
+        for entry in finished:
+            self.pending.remove(entry)
+        # Callbacks may submit follow-up jobs, so they run after the removal.
+        for future, on_ready in finished:
+            self.complete(on_ready, future.result())
+
+    def complete(self, on_ready: Callable[[Any], None], result: Any) -> None:
+        self.completed += 1
+        on_ready(result)
+
+    def wait(self) -> None:
+        """Blocks until every job, including follow-up jobs, has completed."""
+        while not self.done:
+            if self.pending:
+                self.pending[0][0].result()
+            self.poll()
+
+    def shutdown(self) -> None:
+        if self.executor is not None:
+            self.executor.shutdown(wait=False)
@@ -0,0 +1,88 @@
+import numpy as np
+
+
+def expand_ranges(starts: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """Concatenates `arange(start, start + count)` for every start and count."""
+    total = int(counts.sum())
+    offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+    return np.repeat(starts, counts) + offsets
+
+
+class UniformGrid:
+    """Uniform grid broadphase over axis-aligned (x, y, w, h) boxes.
+
+    `insert` bins a set of boxes (e.g. the obstacles) into the square cells of
+    `bounds` that they touch; boxes reaching outside the bounds are clamped
+    into the border cells. `query` then returns the pairs of query boxes and
+    inserted boxes that overlap, found by looking up only the cells a query
+    box touches. Both run on whole arrays, so the cost grows with the number
+    of boxes and their overlaps rather than with every box against every
+    other. Overlap is strict and boxes without area never collide, as with
+    `FRect.colliderect`.
+    """
+
+    def __init__(
+        self, bounds: tuple[float, float, float, float], cell_size: float = 128.0
+    ) -> None:
+        self.origin = np.array(bounds[:2], dtype=np.float64)
+        self.cell_size = cell_size
+        self.num_cells = np.maximum(
+            np.ceil(np.array(bounds[2:], dtype=np.float64) / cell_size), 1
+        ).astype(np.int64)
+        self.insert(np.empty((0, 4)))
+
+    def cell_coords(self, points: np.ndarray) -> np.ndarray:
+        cell = np.floor((points - self.origin) / self.cell_size).astype(np.int64)
+        return np.clip(cell, 0, self.num_cells - 1)
+
+    def cells(self, boxes: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Returns (box index, cell id) for every cell each box touches."""
+        first = self.cell_coords(boxes[:, :2])
+        span = self.cell_coords(boxes[:, :2] + boxes[:, 2:]) - first + 1
+        counts = span[:, 0] * span[:, 1]
+        box = np.repeat(np.arange(len(boxes)), counts)
+        k = expand_ranges(np.zeros(len(boxes), dtype=np.int64), counts)
+        x = first[box, 0] + k % span[box, 0]
+        y = first[box, 1] + k // span[box, 0]
+        return box, y * self.num_cells[0] + x
+
+    def insert(self, boxes: np.ndarray) -> None:
+        """Replaces the boxes that `query` tests against."""
+        self.boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+        box, cell = self.cells(self.boxes)
+        order = np.argsort(cell, kind="stable")
+        self.cell_boxes = box[order]
+        self.sorted_cells = cell[order]
+
+    def query(self, boxes: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Finds the overlapping pairs of `boxes` and the inserted boxes.
+
+        Returns two index arrays, into `boxes` and into the inserted boxes,
+        sorted by the first index and then the second.
+        """
+        boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+        box, cell = self.cells(boxes)
+        start = np.searchsorted(self.sorted_cells, cell, side="left")
+        end = np.searchsorted(self.sorted_cells, cell, side="right")
+        counts = end - start
+        first = np.repeat(box, counts)
+        pair_cells = np.repeat(cell, counts)
+        second = self.cell_boxes[expand_ranges(start, counts)]
+        a, b = boxes[first], self.boxes[second]
+        overlap = (
+            (a[:, 0] < b[:, 0] + b[:, 2])
+            & (a[:, 0] + a[:, 2] > b[:, 0])
+            & (a[:, 1] < b[:, 1] + b[:, 3])
+            & (a[:, 1] + a[:, 3] > b[:, 1])
+            & (a[:, 2] > 0)
+            & (a[:, 3] > 0)
+            & (b[:, 2] > 0)
+            & (b[:, 3] > 0)
+        )
+        # Boxes sharing several cells meet in each of them; the pair is kept
+        # only in the cell holding the top-left corner of their intersection.
+        corner = self.cell_coords(np.maximum(a[:, :2], b[:, :2]))
+        overlap &= corner[:, 1] * self.num_cells[0] + corner[:, 0] == pair_cells
+        first, second = first[overlap], second[overlap]
+        order = np.argsort(first * len(self.boxes) + second)
+        return first[order], second[order]
@@ -0,0 +1,27 @@
+import numpy as np
+
+
+class EntityStore:
+    """Gameplay state of a render group's sprites, one row per instance slot.
+
+    Position, size, rotation, texture layer, depth and motion are kept in the
+    group's `instance_data`; the columns here hold what the renderer does not
+    need. Both are indexed by slot and grow together, so game logic can run on
+    whole columns at once.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        self.speed = np.zeros(capacity, dtype=np.float64)
+        self.health = np.zeros(capacity, dtype=np.float64)
+        self.damage = np.zeros(capacity, dtype=np.float64)
+
+    def resize(self, capacity: int, live: int) -> None:
+        for name in ("speed", "health", "damage"):
+            column = np.zeros(capacity, dtype=np.float64)
+            column[:live] = getattr(self, name)[:live]
+            setattr(self, name, column)
+
+    def reset(self, slots: int | np.ndarray | slice) -> None:
+        self.speed[slots] = 0.0
+        self.health[slots] = 0.0
+        self.damage[slots] = 0.0
@@ -1,21 +1,44 @@
 from typing import TYPE_CHECKING
 
+import numpy as np
 import pygame
 
-from src.entities.sprite import Sprite
+from src.rendering.render_group import (
+    DEPTH_COLUMN,
+    LAUNCH_TIME_COLUMN,
+    POSITION_COLUMNS,
+    SIZE_COLUMNS,
+    TEX_IDX_COLUMN,
+    TINT_COLUMNS,
+    UV_COLUMNS,
+    VELOCITY_COLUMNS,
+)
 
 if TYPE_CHECKING:
+    from src.broadphase import UniformGrid
+    from src.entities.sprite import Sprite
     from src.scene import Scene
 
 
 class Projectiles:
+    """Fixed-capacity pool of projectiles stored as arrays.
+
+    Each pool entry owns a slot in the default render group, taken a chunk at
+    a time and kept hidden while the entry is free, so shooting and removing
+    projectiles only writes rows. Entries are handed out from a free list and
+    their motion runs in the vertex shader; `step` computes where they are
+    drawn, culls the ones that left the window and resolves hits for all of
+    them at once. Shots beyond `capacity` live projectiles are dropped.
+    """
+
     def __init__(
         self,
         scene: "Scene",
         cd_duration: float = 0.5,
         speed: float = 300,
         damage: int = 10,
-        size: pygame.Vector2 | tuple[int | float, int | float] = pygame.Vector2(10, 30),
+        size: pygame.Vector2 | tuple[int | float, int | float] = (10, 30),
+        capacity: int = 4096,
     ) -> None:
         self.scene = scene
         self.render_groups = scene.render_groups
@@ -23,34 +46,133 @@ class Projectiles:
         self.speed = speed
         self.damage = damage
         self.size = pygame.Vector2(size)
+        self.capacity = capacity
         self.cd_timer = 0.0
-        self.active_projectiles: list[Sprite] = []
         self.is_shooting = False
+        self.origin = np.zeros((capacity, 2), dtype=np.float64)
+        self.velocity = np.zeros((capacity, 2), dtype=np.float64)
+        self.launch_time = np.zeros(capacity, dtype=np.float64)
+        self.damages = np.zeros(capacity, dtype=np.float64)
+        self.active = np.zeros(capacity, dtype=np.bool_)
+        self.clear()
+
+    @property
+    def num_active(self) -> int:
+        return int(np.count_nonzero(self.active))
 
-    def update(self, player: Sprite, dt: float) -> None:
-        if self.cd_timer > 0:
-            self.cd_timer -= dt
+    def clear(self) -> None:
+        """Empties the pool; called after the render group has been cleared."""
+        render_group = self.render_groups["default"]
+        self.generation = render_group.generation
+        self.slots = np.empty(0, dtype=np.int64)
+        # Popped from the end, so the lowest free entry is reused first.
+        self.free: list[int] = []
+        self.active[:] = False
+        region = self.scene.atlas["button"]
+        self.row = np.zeros(render_group.pipeline.instance_stride, dtype=np.float32)
+        self.row[SIZE_COLUMNS] = tuple(self.size)
+        self.row[TEX_IDX_COLUMN] = region.layer
+        self.row[DEPTH_COLUMN] = 8
+        self.row[UV_COLUMNS] = region.uv
+        self.row[TINT_COLUMNS] = (1.0, 0.0, 0.0, 1.0)
 
-        if self.is_shooting and self.cd_timer <= 0:
-            self.shoot(player)
-            self.scene.audio.play_sound(self.scene.sfx["shoot"])
+    def grow(self) -> bool:
+        render_group = self.render_groups["default"]
+        if render_group.generation != self.generation:
+            self.clear()
+        if self.slots.size >= self.capacity:
+            return False
+        chunk = render_group.acquire_chunk()[: self.capacity - self.slots.size]
+        first = self.slots.size
+        self.slots = np.concatenate((self.slots, chunk))
+        self.free.extend(range(self.slots.size - 1, first - 1, -1))
+        return True
+
+    def update(self, player: "Sprite", dt: float) -> None:
+        self.cd_timer -= dt
+        if not self.is_shooting:
+            self.cd_timer = max(self.cd_timer, 0.0)
+            return
+        # Several shots may be due in one frame at high fire rates; each is
+        # launched at the time it was due, so they stay evenly spaced.
+        num_shots = 0
+        while self.cd_timer <= 0 and self.scene.money >= 1:
+            if not self.shoot(player, self.scene.time + self.cd_timer):
+                break
             self.scene.money -= 1
-            self.cd_timer = self.cd_duration
-
-        for proj in self.active_projectiles:
-            proj.pos.y += proj.speed * dt
-            proj.set_pos(proj.pos)
-
-    def shoot(self, player: Sprite) -> None:
-        x_pos = player.pos.x + player.size.x / 2 - self.size.x / 2
-        y_pos = player.pos.y + player.size.y / 2
-        pos = pygame.Vector2(x_pos, y_pos)
-        projectile = Sprite(
-            render_group=self.render_groups["default"],
-            pos=pos,
-            size=self.size,
-            tex_idx=0,
-            depth=8,
-            speed=self.speed,
+            self.cd_timer += self.cd_duration
+            num_shots += 1
+        self.cd_timer = max(self.cd_timer, 0.0)
+        if num_shots:
+            self.scene.play_sound("shoot")
+
+    def shoot(self, player: "Sprite", time: float) -> bool:
+        if not self.free and not self.grow():
+            return False
+        idx = self.free.pop()
+        player_pos, player_size = player.pos, player.size
+        self.origin[idx] = (
+            player_pos.x + player_size.x / 2 - self.size.x / 2,
+            player_pos.y + player_size.y / 2,
+        )
+        self.velocity[idx] = (0, self.speed)
+        self.launch_time[idx] = time
+        self.damages[idx] = self.damage
+        self.active[idx] = True
+        row = self.row.copy()
+        row[POSITION_COLUMNS] = self.origin[idx]
+        row[VELOCITY_COLUMNS] = self.velocity[idx]
+        row[LAUNCH_TIME_COLUMN] = time
+        self.render_groups["default"].write_rows(
+            self.slots[idx : idx + 1], row[None], np.ones(1, dtype=np.bool_)
+        )
+        return True
+
+    def release(self, indices: np.ndarray) -> None:
+        if not indices.size:
+            return
+        self.active[indices] = False
+        self.velocity[indices] = 0.0
+        rows = np.zeros((indices.size, self.row.size), dtype=np.float32)
+        self.render_groups["default"].write_rows(
+            self.slots[indices], rows, np.zeros(indices.size, dtype=np.bool_)
+        )
+        self.free.extend(np.sort(indices)[::-1].tolist())
+
+    def step(
+        self, time: float, targets: "UniformGrid"
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Moves the projectiles to `time`, culls and resolves hits.
+
+        `targets` holds the boxes to hit. Each projectile hits at most one of
+        them, the one inserted first among those it overlaps, and is removed
+        along with the ones that left the window. Returns the hit pairs as arrays of
+        projectile and target indices, in projectile order; the projectiles'
+        `damages` stay readable until their entries are reused.
+        """
+        if self.generation != self.render_groups["default"].generation:
+            self.clear()
+        indices = np.flatnonzero(self.active)
+        pos = self.origin[indices] + self.velocity[indices] * (
+            time - self.launch_time[indices, None]
+        )
+        width, height = self.scene.window.size
+        size_x, size_y = self.size
+        culled = (
+            (pos[:, 0] + size_x <= 0)
+            | (pos[:, 0] >= width)
+            | (pos[:, 1] + size_y <= 0)
+            | (pos[:, 1] >= height)
         )
-        self.active_projectiles.append(projectile)
+        live = np.flatnonzero(~culled)
+        boxes = np.empty((live.size, 4))
+        boxes[:, :2] = pos[live]
+        boxes[:, 2:] = size_x, size_y
+        first, second = targets.query(boxes)
+        # Pairs come sorted, so a projectile's first pair has its lowest target.
+        hit_rows, first_pairs = np.unique(first, return_index=True)
+        hits = live[hit_rows]
+        hit_targets = second[first_pairs]
+        culled[hits] = True
+        self.release(indices[culled])
+        return indices[hits], hit_targets
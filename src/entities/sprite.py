@@ -3,11 +3,38 @@ from typing import TYPE_CHECKING
 
 import pygame
 
+from src.rendering.render_group import (
+    DEPTH_COLUMN,
+    LAUNCH_TIME_COLUMN,
+    POSITION_COLUMNS,
+    ROT_COLUMN,
+    SIZE_COLUMNS,
+    TEX_IDX_COLUMN,
+    TINT_COLUMNS,
+    UV_COLUMNS,
+    VELOCITY_COLUMNS,
+    WOBBLE_COLUMN,
+)
+
 if TYPE_CHECKING:
+    import numpy as np
+
     from src.rendering.render_group import RenderGroup
+    from src.rendering.textures import AtlasRegion
 
 
 class Sprite:
+    """Handle to one instance slot of a render group.
+
+    The sprite's state is stored by slot in the group's arrays: its instance
+    row in `instance_data` and its speed, health and damage in `entities`, so
+    game logic can also work on many sprites at once through those columns.
+    Values read here are copies; assign them back to change the sprite. Once
+    deleted, the sprite has no slot: reading it raises and writes are ignored.
+    """
+
+    __slots__ = ("_flip", "cost", "name", "render_group", "slot")
+
     def __init__(
         self,
         render_group: "RenderGroup",
@@ -21,45 +48,227 @@ class Sprite:
         damage: int = 10,
         cost: int = 0,
         name: str = "default",
+        uv: tuple[float, float, float, float] = (0.0, 0.0, 1.0, 1.0),
+        region: "AtlasRegion | None" = None,
+        visible: bool = True,
+        flip: tuple[bool, bool] = (False, False),
+        tint: tuple[float, float, float, float] = (1.0, 1.0, 1.0, 1.0),
     ) -> None:
         self.render_group = render_group
-        self.pos = pygame.Vector2(pos)
-        self.size = pygame.Vector2(size)
-        self.rect = pygame.FRect(*pos, *size)
-        self.rot = rot
-        self.tex_idx = tex_idx
-        self.depth = depth
-        self.speed = speed
-        self.health = health
-        self.damage = damage
-        self.cost = cost
         self.name = name
-        self._register()
+        self.cost = cost
+        self._flip = (False, False)
+        if region is not None:
+            tex_idx = region.layer
+            uv = region.uv
+        self.slot = render_group.allocate(self)
+        render_group.write(
+            self.slot,
+            (*pos, *size, rot, tex_idx, depth, *uv, 0.0, 0.0, 0.0, 0.0, *tint),
+        )
+        render_group.set_visible(self.slot, visible)
+        entities = render_group.entities
+        entities.speed[self.slot] = speed
+        entities.health[self.slot] = health
+        entities.damage[self.slot] = damage
+        self.flip = flip
+
+    @property
+    def _live_slot(self) -> int:
+        if self.slot < 0:
+            raise ValueError(f"sprite {self.name!r} has been deleted")
+        return self.slot
+
+    @property
+    def row(self) -> "np.ndarray":
+        """The sprite's instance row; a view, so writes must mark it dirty."""
+        return self.render_group.instance_data[self._live_slot]
+
+    def _write(self, columns: int | list[int], values) -> None:
+        if self.slot < 0:
+            return
+        self.render_group.instance_data[self.slot, columns] = values
+        self.render_group.dirty[self.slot] = True
+
+    @property
+    def pos(self) -> pygame.Vector2:
+        return self.position_at(self.render_group.motion_time)
+
+    @property
+    def size(self) -> pygame.Vector2:
+        return pygame.Vector2(*self.row[SIZE_COLUMNS])
+
+    @property
+    def rect(self) -> pygame.FRect:
+        return pygame.FRect(self.pos, self.size)
+
+    @property
+    def rot(self) -> float:
+        return float(self.row[ROT_COLUMN])
+
+    @rot.setter
+    def rot(self, rot: float) -> None:
+        self._write(ROT_COLUMN, rot)
+
+    @property
+    def tex_idx(self) -> float:
+        return float(self.row[TEX_IDX_COLUMN])
+
+    @tex_idx.setter
+    def tex_idx(self, tex_idx: float) -> None:
+        self._write(TEX_IDX_COLUMN, tex_idx)
+
+    @property
+    def depth(self) -> float:
+        return float(self.row[DEPTH_COLUMN])
+
+    @depth.setter
+    def depth(self, depth: float) -> None:
+        if self.slot >= 0 and depth != self.depth:
+            self.render_group.order_dirty = True
+            self._write(DEPTH_COLUMN, depth)
+
+    @property
+    def uv(self) -> tuple[float, float, float, float]:
+        u0, v0, u1, v1 = map(float, self.row[UV_COLUMNS])
+        if self._flip[0]:
+            u0, u1 = u1, u0
+        if self._flip[1]:
+            v0, v1 = v1, v0
+        return u0, v0, u1, v1
+
+    @property
+    def flip(self) -> tuple[bool, bool]:
+        return self._flip
+
+    @flip.setter
+    def flip(self, flip: tuple[bool, bool]) -> None:
+        # Flips swap the uv rect's edges, so mirrored variants of an image
+        # share its atlas region.
+        if self.slot < 0:
+            return
+        if flip[0] != self._flip[0]:
+            self._write([UV_COLUMNS[0], UV_COLUMNS[2]], self.row[UV_COLUMNS[2::-2]])
+        if flip[1] != self._flip[1]:
+            self._write([UV_COLUMNS[1], UV_COLUMNS[3]], self.row[UV_COLUMNS[3::-2]])
+        self._flip = flip
+
+    @property
+    def tint(self) -> tuple[float, float, float, float]:
+        r, g, b, a = map(float, self.row[TINT_COLUMNS])
+        return r, g, b, a
+
+    @tint.setter
+    def tint(self, tint: tuple[float, float, float, float]) -> None:
+        if self.slot >= 0 and tint != self.tint:
+            self._write(TINT_COLUMNS, tint)
+
+    @property
+    def visible(self) -> bool:
+        return bool(self.render_group.visible[self._live_slot])
+
+    @visible.setter
+    def visible(self, visible: bool) -> None:
+        if self.slot >= 0:
+            self.render_group.set_visible(self.slot, visible)
+
+    @property
+    def speed(self) -> float:
+        return float(self.render_group.entities.speed[self._live_slot])
+
+    @speed.setter
+    def speed(self, speed: float) -> None:
+        if self.slot >= 0:
+            self.render_group.entities.speed[self.slot] = speed
+
+    @property
+    def health(self) -> float:
+        return float(self.render_group.entities.health[self._live_slot])
+
+    @health.setter
+    def health(self, health: float) -> None:
+        if self.slot >= 0:
+            self.render_group.entities.health[self.slot] = health
+
+    @property
+    def damage(self) -> float:
+        return float(self.render_group.entities.damage[self._live_slot])
+
+    @damage.setter
+    def damage(self, damage: float) -> None:
+        if self.slot >= 0:
+            self.render_group.entities.damage[self.slot] = damage
+
+    @property
+    def velocity(self) -> pygame.Vector2:
+        return pygame.Vector2(*self.row[VELOCITY_COLUMNS])
+
+    @property
+    def kinematic(self) -> bool:
+        return bool(self.row[VELOCITY_COLUMNS].any() or self.row[WOBBLE_COLUMN])
+
+    def set_region(self, region: "AtlasRegion") -> None:
+        if self.slot < 0:
+            return
+        self._write(TEX_IDX_COLUMN, region.layer)
+        flip, self._flip = self._flip, (False, False)
+        self._write(UV_COLUMNS, region.uv)
+        self.flip = flip
 
     def set_pos(self, pos: pygame.Vector2 | tuple[float | int, float | int]) -> None:
-        self.pos = pygame.Vector2(pos)
-        self.rect.topleft = self.pos.x, self.pos.y
+        if self.slot < 0:
+            return
+        self._write(POSITION_COLUMNS, tuple(pos))
+        if self.kinematic:
+            # Motion continues from the new position.
+            self._write(LAUNCH_TIME_COLUMN, self.render_group.motion_time)
 
     def set_size(self, size: pygame.Vector2 | tuple[float | int, float | int]) -> None:
-        self.size = pygame.Vector2(size)
-        self.rect.size = self.size.x, self.size.y
+        self._write(SIZE_COLUMNS, tuple(size))
 
     def move(self, dx: int | float, dy: int | float, dt: float) -> None:
+        if self.slot < 0:
+            return
         if dx != 0 and dy != 0:
             length = math.sqrt(dx * dx + dy * dy)
             dx /= length
             dy /= length
 
-        self.pos.x += dx * self.speed * dt
-        self.pos.y += dy * self.speed * dt
-        self.set_pos(self.pos)
+        speed = self.speed
+        pos = self.pos
+        pos.x += dx * speed * dt
+        pos.y += dy * speed * dt
+        self.set_pos(pos)
+
+    def launch(
+        self,
+        velocity: pygame.Vector2 | tuple[float | int, float | int],
+        time: float,
+        wobble: float = 0.0,
+    ) -> None:
+        """Hands the sprite's motion over to the vertex shader.
 
-    def pack(self) -> tuple[float, float, float, float, float, float, float]:
-        return (*self.rect, self.rot, self.tex_idx, self.depth)
+        From `time` on the sprite moves from its current position with constant
+        `velocity` (pixels per second) and its rotation swings by up to
+        `wobble` degrees, without further instance writes. `pos` follows the
+        motion through the group's `motion_time`.
+        """
+        if self.slot < 0:
+            return
+        self._write(POSITION_COLUMNS, tuple(self.position_at(time)))
+        self._write(VELOCITY_COLUMNS, tuple(velocity))
+        self._write(LAUNCH_TIME_COLUMN, time)
+        self._write(WOBBLE_COLUMN, wobble)
 
-    def _register(self) -> None:
-        self.render_group.sprites.append(self)
+    def position_at(self, time: float) -> pygame.Vector2:
+        row = self.row
+        elapsed = time - row[LAUNCH_TIME_COLUMN]
+        return pygame.Vector2(
+            row[0] + row[VELOCITY_COLUMNS[0]] * elapsed,
+            row[1] + row[VELOCITY_COLUMNS[1]] * elapsed,
+        )
 
     def delete(self) -> None:
-        if self in self.render_group.sprites:
-            self.render_group.sprites.remove(self)
+        if self.slot >= 0:
+            self.render_group.release(self, self.slot)
+            self.slot = -1
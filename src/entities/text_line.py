@@ -1,56 +1,140 @@
-from typing import TYPE_CHECKING, Callable
+from typing import TYPE_CHECKING, Any, Callable, Literal
 
-from src.entities.sprite import Sprite
+import numpy as np
+
+from src.rendering.render_group import (
+    DEPTH_COLUMN,
+    SIZE_COLUMNS,
+    SLOT_CHUNK,
+    TEX_IDX_COLUMN,
+    TINT_COLUMNS,
+    UV_COLUMNS,
+)
 
 if TYPE_CHECKING:
     from src.rendering.render_group import RenderGroup
 
+ALIGN_FACTORS = {"left": 0.0, "center": 0.5, "right": 1.0}
+# A text's source and the function formatting the source's values.
+TextBinding = tuple[str | Callable[[], Any], Callable[[Any], str]]
+
 
 class TextLine:
+    """Text drawn as one block of glyph instances in the font group.
+
+    Characters are mapped to font layers through `glyph_table`, placed with
+    array arithmetic on the fixed-width font grid, and written to the group's
+    instance data in a single `write_rows`. The text may span several lines
+    ("\\n"), each aligned on `pos[0]` as `align` says.
+
+    `source` is either fixed text or a function returning the value to show,
+    which `fmt` turns into text. The text is only formatted when that value
+    changes and only laid out again when the text or visibility changes.
+    """
+
     def __init__(
         self,
-        callback: Callable[[], str],
+        source: str | Callable[[], Any],
         render_group: "RenderGroup",
         font_size: tuple[int, int],
-        font_idx_map: dict[str, int],
+        glyph_table: np.ndarray,
         pos: tuple[int, int],
         depth: float,
+        align: Literal["left", "center", "right"] = "left",
+        line_height: float | None = None,
+        fmt: Callable[[Any], str] = str,
     ):
-        self.callback = callback
+        self.source = source
+        self.fmt = fmt
+        self.value: Any = None
+        self.text = source if isinstance(source, str) else ""
+        # What the instances currently show; None forces the next layout.
+        self.rendered_text: str | None = None
         self.render_group = render_group
         self.depth = depth
         self.pos = pos
-        self.glyphs: list[Sprite] = []
         self.font_size = font_size
-        self.font_idx_map = font_idx_map
+        self.glyph_table = glyph_table
+        self.align = ALIGN_FACTORS[align]
+        self.line_height = line_height or font_size[1]
+        self.chunks: list[np.ndarray] = []
+        self.slots = np.empty(0, dtype=np.int64)
+        self.generation = render_group.generation
+        self.rows = np.empty((0, render_group.pipeline.instance_stride), np.float32)
         self.visible = True
 
+    @property
+    def capacity(self) -> int:
+        return self.slots.size
+
     def create_glyphs(self, num_glyphs: int) -> None:
-        for glyph in self.glyphs:
-            glyph.delete()
-        self.glyphs = [
-            Sprite(
-                render_group=self.render_group,
-                pos=(
-                    (i * self.font_size[0] + self.pos[0]),
-                    self.pos[1],
-                ),
-                size=self.font_size,
-                depth=self.depth,
-            )
-            for i in range(num_glyphs + 1)
-        ]
+        """Grows the line to at least `num_glyphs` slots, a chunk at a time.
+
+        Chunks come from the font group's pool, and the slots already held are
+        kept, so longer text never frees and reallocates the whole line.
+        """
+        while len(self.chunks) * SLOT_CHUNK < num_glyphs:
+            self.chunks.append(self.render_group.acquire_chunk())
+        self.slots = np.concatenate(self.chunks)
+        # Columns other than position and layer never change: plain unrotated
+        # glyphs covering their whole layer, untinted and not moving.
+        self.rows = np.zeros(
+            (self.slots.size, self.render_group.pipeline.instance_stride), np.float32
+        )
+        self.rows[:, SIZE_COLUMNS] = self.font_size
+        self.rows[:, DEPTH_COLUMN] = self.depth
+        self.rows[:, UV_COLUMNS] = (0.0, 0.0, 1.0, 1.0)
+        self.rows[:, TINT_COLUMNS] = 1.0
+
+    def delete(self) -> None:
+        if self.generation == self.render_group.generation:
+            for chunk in self.chunks:
+                self.render_group.release_chunk(chunk)
+        self.chunks = []
+        self.slots = np.empty(0, dtype=np.int64)
+        self.rendered_text = None
 
     def update(self) -> None:
-        text = self.callback() if self.visible else ""
-        if len(text) > len(self.glyphs):
+        if callable(self.source):
+            value = self.source()
+            if value != self.value or self.rendered_text is None:
+                self.value = value
+                self.text = self.fmt(value)
+        text = self.text if self.visible else ""
+        if self.generation != self.render_group.generation:
+            # The group was cleared, which took the slots with it.
+            self.generation = self.render_group.generation
+            self.chunks = []
+            self.slots = np.empty(0, dtype=np.int64)
+            self.rendered_text = None
+        if text == self.rendered_text:
+            return
+        if len(text) > self.capacity:
             self.create_glyphs(len(text))
+        self.layout(text)
+        self.rendered_text = text
 
-        for i, glyph in enumerate(text):
-            glyph_sprite = self.glyphs[i]
-            glyph_sprite.tex_idx = self.font_idx_map[glyph]
-
-        num_glyphs = len(self.glyphs)
-        if len(text) < num_glyphs:
-            for i in range(len(text), num_glyphs):
-                self.glyphs[i].tex_idx = self.font_idx_map[" "]
+    def layout(self, text: str) -> None:
+        codes = np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32)
+        count = codes.size
+        layers = self.glyph_table[np.minimum(codes, self.glyph_table.size - 1)]
+        glyph_width = self.font_size[0]
+        rows = self.rows
+        if "\n" in text:
+            newlines = codes == ord("\n")
+            line = np.cumsum(newlines) - newlines
+            line_starts = np.concatenate(([0], np.flatnonzero(newlines) + 1))
+            column = np.arange(count) - line_starts[line]
+            line_lengths = np.diff(np.append(line_starts, count + 1)) - 1
+            line_offsets = line_lengths * glyph_width * self.align
+            rows[:count, 0] = self.pos[0] + column * glyph_width - line_offsets[line]
+            rows[:count, 1] = self.pos[1] + line * self.line_height
+        else:
+            x = self.pos[0] - count * glyph_width * self.align
+            rows[:count, 0] = x + np.arange(count) * glyph_width
+            rows[:count, 1] = self.pos[1]
+        rows[:count, TEX_IDX_COLUMN] = np.maximum(layers, 0)
+        visible = np.zeros(self.capacity, dtype=np.bool_)
+        # Whitespace and characters without a glyph get no instance.
+        visible[:count] = (layers >= 0) & (codes > ord(" "))
+        self.render_group.write_rows(self.slots, rows, visible)
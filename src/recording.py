@@ -0,0 +1,178 @@
+"""Deterministic recording and replay of game runs.
+
+A recording file starts with a header holding the scene's seed, the step
+rate and the window size, followed by one 16-byte record per frame: the
+frame time, bitsets of the keys down and just pressed, and a checksum of
+the scene state after the frame. With the same seed,
+frame times and input the game reproduces the run exactly, so replaying a
+file (see `ReplayWindow`) checks each frame's checksum against the recorded
+one.
+"""
+
+import struct
+import zlib
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, BinaryIO, Callable, Protocol
+
+import numpy as np
+
+from src.window.inputs_map import Inputs
+
+if TYPE_CHECKING:
+    from webwindow import WebWindow  # type: ignore
+
+    from src.scene import Scene
+    from src.window.pygame_window import PygameWindow
+    from src.window.simulation_window import SimulationWindow
+
+MAGIC = b"REPL"
+VERSION = 1
+# Magic, version, seed, step rate, window width and height.
+HEADER = struct.Struct("<4sHQdHH")
+# Frame time, keys down, keys pressed, state checksum.
+FRAME = struct.Struct("<dHHI")
+FRAME_DTYPE = np.dtype(
+    [
+        ("dt", "<f8"),
+        ("down", "<u2"),
+        ("pressed", "<u2"),
+        ("checksum", "<u4"),
+    ]
+)
+# The keys the scene reads, one bit each in the order listed.
+RECORDED_INPUTS = (
+    Inputs.ArrowUp,
+    Inputs.ArrowDown,
+    Inputs.ArrowLeft,
+    Inputs.ArrowRight,
+    Inputs.Space,
+    Inputs.KeyP,
+    Inputs.KeyF,
+    Inputs.F3,
+    Inputs.Digit1,
+    Inputs.Digit2,
+    Inputs.Digit3,
+)
+INPUT_BITS = {key: 1 << bit for bit, key in enumerate(RECORDED_INPUTS)}
+
+
+def input_bits(is_set: Callable[[Inputs], bool]) -> int:
+    return sum(bit for key, bit in INPUT_BITS.items() if is_set(key))
+
+
+def state_checksum(scene: "Scene") -> int:
+    """CRC32 of the game state: counters, timers and the sprite arrays.
+
+    Only slots below the high-water mark are hashed, so the checksum does not
+    depend on how much spare capacity the render groups hold.
+    """
+    crc = zlib.crc32(
+        struct.pack(
+            "<7d4i4?",
+            scene.time,
+            scene.money,
+            scene.score,
+            scene.bonus_score,
+            scene.datastream_scroll,
+            scene.projectiles.cd_timer,
+            scene.timers["add_obstacle"].elapsed,
+            scene.current_level,
+            scene.enemies_killed,
+            scene.network_breaches,
+            len(scene.obstacles),
+            scene.paused,
+            scene.game_over,
+            scene.intro_panel_active,
+            scene.projectiles.is_shooting,
+        )
+    )
+    group = scene.render_groups["default"]
+    live = slice(0, group.num_slots)
+    for array in (
+        group.instance_data[live],
+        group.visible[live],
+        group.entities.health[live],
+        group.entities.speed[live],
+    ):
+        crc = zlib.crc32(np.ascontiguousarray(array).data, crc)
+    return crc
+
+
+@dataclass
+class Recording:
+    seed: int
+    step_rate: float
+    size: tuple[int, int]
+    frames: np.ndarray
+
+    @classmethod
+    def load(cls, path: str) -> "Recording":
+        with open(path, "rb") as file:
+            data = file.read()
+        magic, version, seed, step_rate, width, height = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} recording")
+        body = data[HEADER.size :]
+        # A run cut short may leave a partial record at the end.
+        count = len(body) // FRAME_DTYPE.itemsize
+        frames = np.frombuffer(body, FRAME_DTYPE, count)
+        return cls(seed, step_rate, (width, height), frames)
+
+
+class FrameRecorder(Protocol):
+    """Sees every frame of a run once the scene has updated."""
+
+    def on_frame(
+        self, window: "PygameWindow | WebWindow | SimulationWindow", scene: "Scene"
+    ) -> None: ...
+
+    def close(self) -> None: ...
+
+
+class Recorder(FrameRecorder):
+    """Writes every frame of a run to a recording file."""
+
+    def __init__(
+        self, path: str, seed: int, step_rate: float, size: tuple[int, int]
+    ) -> None:
+        self.file: BinaryIO = open(path, "wb")
+        self.file.write(HEADER.pack(MAGIC, VERSION, seed, step_rate, *size))
+        self.num_frames = 0
+
+    def on_frame(
+        self, window: "PygameWindow | WebWindow | SimulationWindow", scene: "Scene"
+    ) -> None:
+        self.file.write(
+            FRAME.pack(
+                window.frame_time,
+                input_bits(window.key_down),
+                input_bits(window.key_pressed),
+                state_checksum(scene),
+            )
+        )
+        self.num_frames += 1
+
+    def close(self) -> None:
+        self.file.close()
+
+
+class ReplayVerifier(FrameRecorder):
+    """Compares each replayed frame's state with the recorded checksum."""
+
+    def __init__(self, recording: Recording) -> None:
+        self.checksums = recording.frames["checksum"]
+        self.num_frames = 0
+        # First frame whose state differs from the recording, if any.
+        self.mismatch: int | None = None
+
+    def on_frame(
+        self, window: "PygameWindow | WebWindow | SimulationWindow", scene: "Scene"
+    ) -> None:
+        if self.mismatch is None and state_checksum(scene) != int(
+            self.checksums[self.num_frames]
+        ):
+            self.mismatch = self.num_frames
+        self.num_frames += 1
+
+    def close(self) -> None:
+        pass
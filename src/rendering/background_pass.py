@@ -0,0 +1,100 @@
+from typing import TYPE_CHECKING
+
+import zengl
+
+from src.rendering.render_pipeline import load_shader, template_cache
+
+if TYPE_CHECKING:
+    from zengl import BufferResource
+
+
+class BackgroundPass:
+    """Draws the scrolling datastream effect as a single full-screen pass.
+
+    The effect is rendered at `scale` times the target resolution and blitted
+    (with filtering) onto the target. With `refresh_interval` above 1 the
+    effect is only re-rendered every N frames and the cached image is reused
+    in between. At scale 1 and interval 1 it draws straight into the target.
+    Only the lower-left `render_size` of the target is covered, so the renderer
+    can change its resolution without reallocating anything.
+    """
+
+    def __init__(
+        self,
+        target: zengl.Image,
+        frag_shader_path: str,
+        uniform_buffer: zengl.Buffer,
+        shader_includes: dict[str, str],
+        scale: float = 1.0,
+        refresh_interval: int = 1,
+    ) -> None:
+        self.ctx = zengl.context()
+        self.target = target
+        self.scale = scale
+        self.refresh_interval = max(1, refresh_interval)
+        self.scroll = 0.0
+        self.frame = 0
+        self.draw_calls = 0
+        self.direct = scale == 1.0 and self.refresh_interval == 1
+        if self.direct:
+            self.image = target
+        else:
+            self.image = self.ctx.image(self.scaled(target.size), "rgba8unorm")
+        self.render_size = target.size
+        self.image_size = self.image.size
+        vert_shader_path = "src/rendering/shaders/background.vert"
+        resources: list["BufferResource"] = [
+            {"type": "uniform_buffer", "binding": 0, "buffer": uniform_buffer},
+        ]
+        template = template_cache.get(
+            key=(
+                load_shader(vert_shader_path),
+                load_shader(frag_shader_path),
+                tuple(sorted(shader_includes.items())),
+                self.image.format,
+            ),
+            label=f"{vert_shader_path} + {frag_shader_path}",
+            create=lambda: self.ctx.pipeline(
+                includes=shader_includes,
+                vertex_shader=load_shader(vert_shader_path),
+                fragment_shader=load_shader(frag_shader_path),
+                framebuffer=[self.image],
+                resources=resources,
+                layout=[{"name": "Common", "binding": 0}],
+                topology="triangle_strip",
+                vertex_count=4,
+            ),
+        )
+        self.pipeline = self.ctx.pipeline(
+            template=template,
+            framebuffer=[self.image],
+            resources=resources,
+            viewport=(0, 0, *self.image.size),
+        )
+
+    def scaled(self, size: tuple[int, int]) -> tuple[int, int]:
+        return (
+            max(1, round(size[0] * self.scale)),
+            max(1, round(size[1] * self.scale)),
+        )
+
+    def resize(self, render_size: tuple[int, int]) -> None:
+        self.render_size = render_size
+        self.image_size = render_size if self.direct else self.scaled(render_size)
+        self.pipeline.viewport = (0, 0, *self.image_size)
+        self.frame = 0
+
+    def render(self) -> None:
+        self.draw_calls = 0
+        if self.frame % self.refresh_interval == 0:
+            self.pipeline.render()
+            self.draw_calls += 1
+        self.frame += 1
+        if not self.direct:
+            self.image.blit(
+                self.target,
+                size=self.render_size,
+                crop=(0, 0, *self.image_size),
+                filter=True,
+            )
+            self.draw_calls += 1
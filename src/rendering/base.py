@@ -0,0 +1,52 @@
+from typing import TYPE_CHECKING, Protocol
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from webwindow import WebWindow  # type: ignore
+
+    from src.rendering.render_group import RenderGroup
+    from src.rendering.render_stats import RenderStats
+    from src.rendering.textures import TextureData, Textures
+    from src.window.pygame_window import PygameWindow
+    from src.window.simulation_window import SimulationWindow
+
+
+class InstancePipeline(Protocol):
+    """Where a RenderGroup uploads and draws its instance rows."""
+
+    instance_stride: int
+    rebuilds: int
+
+    def set_viewport(self, viewport: tuple[int, int, int, int]) -> None: ...
+
+    def resize(self, instance_capacity: int) -> None: ...
+
+    def write(self, instance_data: np.ndarray, rows: np.ndarray) -> int: ...
+
+    def render(self, instance_count: int) -> None: ...
+
+
+class Background(Protocol):
+    scroll: float
+
+
+class SceneRenderer(Protocol):
+    """What the app and the scene use of a renderer."""
+
+    window: "PygameWindow | WebWindow | SimulationWindow"
+    render_groups: dict[str, "RenderGroup"]
+    textures: "Textures | None"
+    background: Background
+    stats: "RenderStats"
+    avg_fps: float
+
+    @property
+    def motion_time(self) -> float: ...
+
+    @motion_time.setter
+    def motion_time(self, motion_time: float) -> None: ...
+
+    def load_textures(self, data: "TextureData") -> None: ...
+
+    def render(self) -> None: ...
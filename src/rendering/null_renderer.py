@@ -0,0 +1,103 @@
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from src.rendering.base import InstancePipeline, SceneRenderer
+from src.rendering.render_group import CapacityPolicy, RenderGroup
+from src.rendering.render_pipeline import INSTANCE_STRIDE
+from src.rendering.render_stats import RenderStats
+from src.rendering.renderer import EXPECTED_INSTANCES
+from src.rendering.textures import TextureData, Textures
+
+if TYPE_CHECKING:
+    import numpy as np
+
+    from src.window.simulation_window import SimulationWindow
+
+
+class NullPipeline(InstancePipeline):
+    """RenderPipeline stand-in that has the instance layout but no GPU side."""
+
+    instance_stride = INSTANCE_STRIDE
+    rebuilds = 0
+
+    def set_viewport(self, viewport: tuple[int, int, int, int]) -> None:
+        pass
+
+    def resize(self, instance_capacity: int) -> None:
+        pass
+
+    def write(self, instance_data: "np.ndarray", rows: "np.ndarray") -> int:
+        return 0
+
+    def render(self, instance_count: int) -> None:
+        pass
+
+
+class NullRenderGroup(RenderGroup):
+    """RenderGroup that only tracks its sprites' slots and instance data."""
+
+    def render(self, motion_time: float = 0.0) -> None:
+        self.frame_block_writes = self.block_writes
+        self.block_writes = 0
+        self.update_capacity()
+        self.dirty[:] = False
+
+
+@dataclass
+class NullBackground:
+    scroll: float = 0.0
+
+
+class NullRenderer(SceneRenderer):
+    """Renderer stand-in for running the game without a window or GL context.
+
+    It has the renderer's render groups, textures and clock, so a Scene runs
+    on it unchanged, but textures keep only their layout and nothing is drawn.
+    """
+
+    def __init__(
+        self,
+        window: "SimulationWindow",
+        expected_instances: dict[str, int] = EXPECTED_INSTANCES,
+    ) -> None:
+        self.window = window
+        width, height = window.size
+        self.resolution = (width, height)
+        self.expected_instances = expected_instances
+        self.background = NullBackground()
+        self.stats = RenderStats()
+        self.avg_fps = 0.0
+        self._motion_time = 0.0
+        self.textures: Textures | None = None
+        self.render_groups: dict[str, RenderGroup] = {}
+
+    @property
+    def motion_time(self) -> float:
+        return self._motion_time
+
+    @motion_time.setter
+    def motion_time(self, motion_time: float) -> None:
+        self._motion_time = motion_time
+        for render_group in self.render_groups.values():
+            render_group.motion_time = motion_time
+
+    def load_textures(self, data: TextureData) -> None:
+        self.set_textures(Textures(data, upload=False))
+
+    def set_textures(self, textures: Textures) -> None:
+        self.textures = textures
+        self.render_groups = {
+            name: NullRenderGroup(
+                NullPipeline(),
+                self.resolution,
+                CapacityPolicy(expected=self.expected_instances[name]),
+                translucent=name != "default",
+            )
+            for name in ("default", "translucent", "font")
+        }
+        for render_group in self.render_groups.values():
+            render_group.motion_time = self._motion_time
+
+    def render(self) -> None:
+        for render_group in self.render_groups.values():
+            render_group.render(self._motion_time)
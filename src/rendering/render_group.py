@@ -1,51 +1,320 @@
+import heapq
+from dataclasses import dataclass
 from typing import TYPE_CHECKING
 
 import numpy as np
-import zengl
 
-from src.rendering.render_pipeline import RenderPipeline
+from src.entities.entity_store import EntityStore
 
 if TYPE_CHECKING:
     from src.entities.sprite import Sprite
+    from src.rendering.base import InstancePipeline
+
+
+@dataclass
+class CapacityPolicy:
+    """Sizing rules for a RenderGroup's instance array and GPU buffer.
+
+    `expected` is the pre-sized capacity and the floor the group never shrinks
+    below. Growth happens once the live rows pass `grow_at` of the capacity, so
+    the buffer is replaced ahead of the frame that would overflow it; shrinking
+    waits until usage stays under `shrink_at` for `shrink_after` frames.
+    """
+
+    expected: int = 64
+    grow_at: float = 0.75
+    growth_factor: int = 2
+    shrink_at: float = 0.25
+    shrink_after: int = 600
+
+
+# Columns of the instance layout addressed from numpy.
+POSITION_COLUMNS = [0, 1]
+SIZE_COLUMNS = [2, 3]
+ROT_COLUMN = 4
+TEX_IDX_COLUMN = 5
+DEPTH_COLUMN = 6
+UV_COLUMNS = [7, 8, 9, 10]
+VELOCITY_COLUMNS = [11, 12]
+LAUNCH_TIME_COLUMN = 13
+WOBBLE_COLUMN = 14
+TINT_COLUMNS = [15, 16, 17, 18]
+
+# Slots handed out at a time to owners of many instances, such as text lines.
+SLOT_CHUNK = 16
+
+# Angular frequency (rad/s) of the rotation wobble of kinematic sprites, shared
+# with the vertex shader through the "constants" include.
+WOBBLE_FREQUENCY = 10.0
 
 
 class RenderGroup:
     def __init__(
         self,
-        texture: zengl.Image | None,
-        vert_shader_path: str,
-        frag_shader_path: str,
-        uniform_buffer: zengl.Buffer,
-        shader_includes: dict[str, str],
-        framebuffers: list[zengl.Image],
+        pipeline: "InstancePipeline",
+        size: tuple[int, int],
+        capacity_policy: CapacityPolicy | None = None,
+        translucent: bool = False,
     ) -> None:
-        self.sprites: list["Sprite"] = []
-        self.pipeline = RenderPipeline(
-            texture=texture,
-            vert_shader_path=vert_shader_path,
-            frag_shader_path=frag_shader_path,
-            uniform_buffer=uniform_buffer,
-            shader_includes=shader_includes,
-            framebuffers=framebuffers,
-        )
+        self.translucent = translucent
+        self.capacity_policy = capacity_policy or CapacityPolicy()
+        self.pipeline = pipeline
+        # Visible area in sprite coordinates (x, y, width, height), used for
+        # culling; the renderer moves it with the camera and resolution.
+        self.viewport = (0.0, 0.0, *map(float, size))
+        # Keyed by slot, so releasing a sprite does not search a list.
+        self.sprites: dict[int, "Sprite"] = {}
+        self.allocate_arrays(self.capacity_policy.expected)
+        self.entities = EntityStore(self.capacity_policy.expected)
+        # Clock of kinematic sprites, set by the renderer before the scene
+        # updates so sprite positions match what is drawn this frame.
+        self.motion_time = 0.0
+        self.order_dirty = False
+        self.num_drawn = 0
+        self.num_culled = 0
+        self.free_slots: list[int] = []
+        self.free_slots_set: set[int] = set()
+        self.num_slots = 0
+        self.low_usage_frames = 0
+        self.bytes_uploaded = 0
+        # Bumped by `clear`, which frees slots held outside of Sprites.
+        self.generation = 0
+        self.chunk_pool: list[np.ndarray] = []
+        # `write_rows` calls since the last render, and in the frame rendered.
+        self.block_writes = 0
+        self.frame_block_writes = 0
+
+    @property
+    def capacity(self) -> int:
+        return self.instance_data.shape[0]
+
+    def allocate_arrays(self, capacity: int) -> None:
+        # instance_data is indexed by slot; draw_data holds the drawn rows in
+        # draw order and mirrors the GPU buffer. draw_order maps draw rows to
+        # slots (-1 for rows the GPU copy is not known to hold) and draw_rows
+        # is its inverse (-1 for hidden or culled slots).
         self.instance_data = np.zeros(
-            (1, self.pipeline.instance_stride),
+            (capacity, self.pipeline.instance_stride),
             dtype=np.float32,
         )
+        self.dirty = np.zeros(capacity, dtype=np.bool_)
+        self.visible = np.ones(capacity, dtype=np.bool_)
+        self.drawn = np.zeros(capacity, dtype=np.bool_)
+        self.draw_data = np.zeros_like(self.instance_data)
+        self.draw_order = np.full(capacity, -1, dtype=np.int64)
+        self.draw_rows = np.full(capacity, -1, dtype=np.int64)
+
+    def allocate(self, sprite: "Sprite") -> int:
+        slot = self.allocate_slot()
+        self.sprites[slot] = sprite
+        return slot
+
+    def allocate_slot(self) -> int:
+        while self.free_slots:
+            slot = heapq.heappop(self.free_slots)
+            # Slots trimmed off the tail stay in the heap until popped here.
+            if slot in self.free_slots_set:
+                self.free_slots_set.remove(slot)
+                self.order_dirty = True
+                return slot
+        if self.num_slots == self.capacity:
+            self.resize(self.capacity * self.capacity_policy.growth_factor)
+        self.order_dirty = True
+        self.num_slots += 1
+        return self.num_slots - 1
+
+    def allocate_slots(self, count: int) -> np.ndarray:
+        """Allocates `count` slots not tied to a Sprite, e.g. for text glyphs.
+
+        Their owner writes them with `write_rows`; `clear` invalidates them by
+        bumping `generation`.
+        """
+        return np.array([self.allocate_slot() for _ in range(count)], dtype=np.int64)
+
+    def acquire_chunk(self) -> np.ndarray:
+        """Takes `SLOT_CHUNK` slots from the pool, allocating them if it is empty."""
+        if self.chunk_pool:
+            return self.chunk_pool.pop()
+        return self.allocate_slots(SLOT_CHUNK)
+
+    def release_chunk(self, slots: np.ndarray) -> None:
+        # Pooled chunks stay allocated but hidden until they are reused.
+        self.visible[slots] = False
+        self.dirty[slots] = True
+        self.chunk_pool.append(slots)
+
+    def release(self, sprite: "Sprite", slot: int) -> None:
+        if self.sprites.get(slot) is sprite:
+            del self.sprites[slot]
+        self.release_slot(slot)
 
-    def render(self) -> None:
-        if not self.sprites:
+    def release_slot(self, slot: int) -> None:
+        self.instance_data[slot] = 0.0
+        self.entities.reset(slot)
+        self.visible[slot] = True
+        self.dirty[slot] = True
+        self.order_dirty = True
+        if slot < self.num_slots - 1:
+            heapq.heappush(self.free_slots, slot)
+            self.free_slots_set.add(slot)
             return
-        if len(self.sprites) > self.instance_data.shape[0]:
-            self.instance_data = np.zeros(
-                (len(self.sprites) * 2, self.pipeline.instance_stride),
-                dtype=np.float32,
-            )
-        sprites_data = [sprite.pack() for sprite in self.sprites]
-        num_empty_sprites = self.instance_data.shape[0] - len(self.sprites)
-        zeros = [
-            [0.0 for _ in range(self.pipeline.instance_stride)]
-            for _ in range(num_empty_sprites)
+        self.num_slots = slot
+        while self.num_slots - 1 in self.free_slots_set:
+            self.num_slots -= 1
+            self.free_slots_set.remove(self.num_slots)
+
+    def write(self, slot: int, values: tuple[float, ...]) -> None:
+        if self.instance_data[slot, DEPTH_COLUMN] != values[DEPTH_COLUMN]:
+            self.order_dirty = True
+        self.instance_data[slot] = values
+        self.dirty[slot] = True
+
+    def write_rows(
+        self, slots: np.ndarray, rows: np.ndarray, visible: np.ndarray
+    ) -> None:
+        """Block version of `write` plus `set_visible` for many slots at once."""
+        if not np.array_equal(
+            self.instance_data[slots, DEPTH_COLUMN], rows[:, DEPTH_COLUMN]
+        ):
+            self.order_dirty = True
+        self.instance_data[slots] = rows
+        self.visible[slots] = visible
+        self.dirty[slots] = True
+        self.block_writes += 1
+
+    def set_visible(self, slot: int, visible: bool) -> None:
+        if self.visible[slot] != visible:
+            self.visible[slot] = visible
+            self.dirty[slot] = True
+
+    def resize(self, capacity: int) -> None:
+        instance_data = self.instance_data[: self.num_slots]
+        visible = self.visible[: self.num_slots]
+        self.allocate_arrays(capacity)
+        self.instance_data[: self.num_slots] = instance_data
+        self.visible[: self.num_slots] = visible
+        self.entities.resize(capacity, self.num_slots)
+        self.order_dirty = True
+        self.pipeline.resize(capacity)
+
+    def update_capacity(self) -> None:
+        policy = self.capacity_policy
+        if self.num_slots > self.capacity * policy.grow_at:
+            self.resize(self.capacity * policy.growth_factor)
+            self.low_usage_frames = 0
+        elif (
+            self.capacity > policy.expected
+            and self.num_slots < self.capacity * policy.shrink_at
+        ):
+            self.low_usage_frames += 1
+            if self.low_usage_frames >= policy.shrink_after:
+                self.resize(max(policy.expected, self.capacity // 2))
+                self.low_usage_frames = 0
+        else:
+            self.low_usage_frames = 0
+
+    def clear(self) -> None:
+        for sprite in self.sprites.values():
+            sprite.slot = -1
+        self.sprites.clear()
+        self.chunk_pool.clear()
+        self.free_slots.clear()
+        self.free_slots_set.clear()
+        self.num_slots = 0
+        self.instance_data[:] = 0.0
+        self.entities.reset(slice(None))
+        self.visible[:] = True
+        self.dirty[:] = False
+        self.order_dirty = True
+        self.generation += 1
+
+    def has_motion(self) -> bool:
+        live = self.num_slots
+        return bool(
+            self.instance_data[:live, VELOCITY_COLUMNS].any()
+            or self.instance_data[:live, WOBBLE_COLUMN].any()
+        )
+
+    def positions_at(self, time: float, slots: np.ndarray | slice) -> np.ndarray:
+        """Top-left corners where the vertex shader draws `slots` at `time`."""
+        data = self.instance_data[slots]
+        elapsed = time - data[:, LAUNCH_TIME_COLUMN]
+        return data[:, POSITION_COLUMNS] + data[:, VELOCITY_COLUMNS] * elapsed[:, None]
+
+    def update_drawn(self, motion_time: float) -> None:
+        """Flags the live slots that are visible and overlap the viewport.
+
+        Freed slots are zeroed and so fall out with the zero-size sprites that
+        the scene uses as placeholders. Kinematic sprites are placed where the
+        vertex shader draws them at `motion_time`, and rotated sprites are
+        tested with the bounding box of their rotated rect.
+        """
+        live = self.num_slots
+        data = self.instance_data[:live]
+        x, y = self.positions_at(motion_time, slice(live)).T
+        w, h = data[:, 2], data[:, 3]
+        rot = np.radians(
+            data[:, ROT_COLUMN]
+            + data[:, WOBBLE_COLUMN] * np.sin(motion_time * WOBBLE_FREQUENCY)
+        )
+        cos, sin = np.abs(np.cos(rot)), np.abs(np.sin(rot))
+        half_w, half_h = w / 2, h / 2
+        extent_x = cos * half_w + sin * half_h
+        extent_y = sin * half_w + cos * half_h
+        center_x, center_y = x + half_w, y + half_h
+        view_x, view_y, view_w, view_h = self.viewport
+        shown = self.visible[:live] & (w > 0) & (h > 0)
+        in_view = (
+            (center_x + extent_x > view_x)
+            & (center_x - extent_x < view_x + view_w)
+            & (center_y + extent_y > view_y)
+            & (center_y - extent_y < view_y + view_h)
+        )
+        drawn = shown & in_view
+        # Only shown sprites outside the viewport count as culled, not hidden
+        # sprites, pooled text chunks or placeholders.
+        self.num_culled = int(np.count_nonzero(shown & ~in_view))
+        if not np.array_equal(drawn, self.drawn[:live]):
+            self.order_dirty = True
+        self.drawn[:live] = drawn
+        self.drawn[live:] = False
+
+    def update_draw_order(self) -> np.ndarray:
+        """Sorts the drawn slots by depth and returns the draw rows that moved.
+
+        Opaque groups draw front-to-back (highest depth first) so the depth
+        test rejects the overdraw behind them; translucent groups draw
+        back-to-front so they blend over what is already in the frame.
+        """
+        slots = np.flatnonzero(self.drawn[: self.num_slots])
+        depths = self.instance_data[slots, DEPTH_COLUMN]
+        order = slots[
+            np.argsort(depths if self.translucent else -depths, kind="stable")
         ]
-        self.instance_data[:] = sprites_data + zeros
-        self.pipeline.render(self.instance_data)
+        self.num_drawn = order.size
+        moved = np.flatnonzero(order != self.draw_order[: self.num_drawn])
+        self.draw_order[: self.num_drawn] = order
+        self.draw_order[self.num_drawn :] = -1
+        self.draw_rows[:] = -1
+        self.draw_rows[order] = np.arange(self.num_drawn)
+        self.order_dirty = False
+        return moved
+
+    def render(self, motion_time: float = 0.0) -> None:
+        self.bytes_uploaded = 0
+        self.frame_block_writes = self.block_writes
+        self.block_writes = 0
+        self.update_capacity()
+        live = self.num_slots
+        dirty_slots = np.flatnonzero(self.dirty[:live])
+        if self.order_dirty or dirty_slots.size or self.has_motion():
+            self.update_drawn(motion_time)
+        moved = self.update_draw_order() if self.order_dirty else np.empty(0, int)
+        self.dirty[:] = False
+        if not self.num_drawn:
+            return
+        dirty_rows = self.draw_rows[dirty_slots]
+        rows = np.union1d(dirty_rows[dirty_rows >= 0], moved)
+        self.draw_data[rows] = self.instance_data[self.draw_order[rows]]
+        self.bytes_uploaded = self.pipeline.write(self.draw_data, rows)
+        self.pipeline.render(self.num_drawn)
@@ -1,19 +1,128 @@
 import re
-from typing import TYPE_CHECKING, Iterable
+import time
+from functools import cache
+from typing import TYPE_CHECKING, Callable, Hashable, Iterable
 
 import numpy as np
 import zengl
 
+from src.rendering.base import InstancePipeline
+
 if TYPE_CHECKING:
-    from zengl import BufferResource, LayoutBinding, SamplerResource
+    from zengl import (
+        BlendSettings,
+        BufferResource,
+        DepthSettings,
+        LayoutBinding,
+        SamplerResource,
+    )
 
 
+@cache
 def load_shader(path: str) -> str:
     with open(path, "r") as file:
         return file.read()
 
 
-class RenderPipeline:
+class TemplateCache:
+    """Shares compiled template pipelines between identical RenderPipelines.
+
+    Templates are keyed by everything that ends up in the linked program or
+    its fixed-function state; textures, buffers and instance counts are
+    supplied per pipeline when it is created from the template. Templates
+    that need an instance buffer bind the shared `placeholder`, which lives as
+    long as they do.
+    """
+
+    def __init__(self) -> None:
+        self.templates: dict[Hashable, zengl.Pipeline] = {}
+        # Label and compile time of each template, keyed like `templates`.
+        self.compile_times: dict[Hashable, tuple[str, float]] = {}
+        self.hits = 0
+        self.placeholder_buffer: zengl.Buffer | None = None
+
+    def placeholder(self, ctx: zengl.Context) -> zengl.Buffer:
+        if self.placeholder_buffer is None:
+            self.placeholder_buffer = ctx.buffer(size=1)
+        return self.placeholder_buffer
+
+    def get(
+        self, key: Hashable, label: str, create: Callable[[], zengl.Pipeline]
+    ) -> zengl.Pipeline:
+        template = self.templates.get(key)
+        if template is not None:
+            self.hits += 1
+            return template
+        start = time.perf_counter()
+        template = self.templates[key] = create()
+        self.compile_times[key] = (label, time.perf_counter() - start)
+        return template
+
+    def release(self, ctx: zengl.Context) -> None:
+        """Releases the templates and the placeholder buffer."""
+        for template in self.templates.values():
+            ctx.release(template)
+        if self.placeholder_buffer is not None:
+            ctx.release(self.placeholder_buffer)
+        self.templates.clear()
+        self.placeholder_buffer = None
+
+    def report(self) -> str:
+        compile_times = self.compile_times.values()
+        lines = [
+            f"{label}: {seconds * 1000:.1f} ms" for label, seconds in compile_times
+        ]
+        total = sum(seconds for _, seconds in compile_times)
+        lines.append(
+            f"{len(self.templates)} programs compiled, {self.hits} reused, "
+            f"{total * 1000:.1f} ms total"
+        )
+        return "\n".join(lines)
+
+
+template_cache = TemplateCache()
+
+# Opaque pipelines alpha-test instead of blending; the atlas has transparent
+# black around every image, so mipmapped edges are un-premultiplied.
+OPAQUE_INCLUDE = """
+    #define OPAQUE
+    const float ALPHA_CUTOFF = 0.5;
+"""
+TRANSLUCENT_INCLUDE = """
+    const float ALPHA_CUTOFF = 0.0;
+"""
+
+# Per-instance attributes: rect, rotation, layer, depth, uv, motion, tint.
+INSTANCE_LAYOUT = ("4f 1f 1f 1f 4f 4f 4f /i", *(2, 3, 4, 5, 6, 7, 8))
+# Floats per instance row.
+INSTANCE_STRIDE = sum(map(int, re.findall(r"\d+", INSTANCE_LAYOUT[0])))
+
+
+def coalesce_rows(
+    rows: np.ndarray, max_gap: int = 16, max_ranges: int = 8
+) -> list[tuple[int, int]]:
+    if rows.size == 0:
+        return []
+    breaks = np.flatnonzero(np.diff(rows) > max_gap + 1)
+    starts = np.concatenate(([rows[0]], rows[breaks + 1]))
+    stops = np.concatenate((rows[breaks] + 1, [rows[-1] + 1]))
+    if starts.size > max_ranges:
+        return [(int(rows[0]), int(rows[-1]) + 1)]
+    return [(int(start), int(stop)) for start, stop in zip(starts, stops)]
+
+
+class RenderPipeline(InstancePipeline):
+    """Instanced sprite pipeline over a ring of `ring_depth` instance buffers.
+
+    Each buffer has its own pipeline and the ring advances after every draw,
+    so uploads go to a buffer the GPU finished reading frames ago instead of
+    the one the previous draw used. Rows changed while a buffer was out of
+    turn are kept pending for it and uploaded when its turn comes. This
+    matters most for the WebGL build, where `bufferSubData` on a buffer a
+    queued draw still reads makes the browser wait or copy; `ring_depth=1`
+    gives a single buffer.
+    """
+
     def __init__(
         self,
         texture: zengl.Image | None,
@@ -22,13 +131,20 @@ class RenderPipeline:
         uniform_buffer: zengl.Buffer,
         shader_includes: dict[str, str],
         framebuffers: list[zengl.Image],
+        instance_capacity: int = 1,
+        translucent: bool = False,
+        ring_depth: int = 3,
     ) -> None:
         self.texture = texture
         self.vert_shader_path = vert_shader_path
         self.frag_shader_path = frag_shader_path
         self.uniform_buffer = uniform_buffer
-        self.shader_includes = shader_includes
+        self.shader_includes = {
+            **shader_includes,
+            "blending": TRANSLUCENT_INCLUDE if translucent else OPAQUE_INCLUDE,
+        }
         self.framebuffers = framebuffers
+        self.viewport = (0, 0, *framebuffers[0].size)
         self.ctx = zengl.context()
         self.vertices = np.array(
             (
@@ -43,12 +159,13 @@ class RenderPipeline:
             dtype=np.float32,
         )
         self.vertex_layout = ("2f 2f", *(0, 1))
-        self.instance_layout = ("4f 1f 1f 1f /i", *(2, 3, 4, 5))
+        self.instance_layout = INSTANCE_LAYOUT
         self.vertex_buffer = self.ctx.buffer(self.vertices)
-        self.instance_buffer = self.ctx.buffer(size=1)
-        self.instance_stride = sum(
-            map(int, re.findall(r"\d+", self.instance_layout[0]))
-        )
+        self.ring_depth = max(1, ring_depth)
+        self.ring_index = 0
+        self.instance_stride = INSTANCE_STRIDE
+        self.instance_size = zengl.calcsize(self.instance_layout[0])
+        self.rebuilds = 0
         self.resources: Iterable["BufferResource | SamplerResource"] = [
             {
                 "type": "uniform_buffer",
@@ -68,40 +185,125 @@ class RenderPipeline:
                 }
             )
             self.layout.append({"name": f"Texture0", "binding": 0})
-        self.template_pipeline = self.ctx.pipeline(
+        self.blend: "BlendSettings | None" = (
+            {
+                "enable": True,
+                "src_color": "src_alpha",
+                "dst_color": "one_minus_src_alpha",
+            }
+            if translucent
+            else None
+        )
+        self.depth: "DepthSettings" = {"func": "less", "write": not translucent}
+        self.template_pipeline = template_cache.get(
+            key=self.template_key(),
+            label=f"{self.vert_shader_path} + {self.frag_shader_path} "
+            f"({'translucent' if translucent else 'opaque'})",
+            create=self.create_template_pipeline,
+        )
+        self.create_ring(instance_capacity)
+
+    @property
+    def instance_buffer(self) -> zengl.Buffer:
+        return self.instance_buffers[self.ring_index]
+
+    @property
+    def pipeline(self) -> zengl.Pipeline:
+        return self.pipelines[self.ring_index]
+
+    def template_key(self) -> Hashable:
+        return (
+            load_shader(self.vert_shader_path),
+            load_shader(self.frag_shader_path),
+            tuple(sorted(self.shader_includes.items())),
+            tuple(binding["name"] for binding in self.layout),
+            tuple(sorted(self.blend.items())) if self.blend else None,
+            tuple(sorted(self.depth.items())),
+            tuple(framebuffer.format for framebuffer in self.framebuffers),
+            self.vertex_layout,
+            self.instance_layout,
+        )
+
+    def create_template_pipeline(self) -> zengl.Pipeline:
+        return self.ctx.pipeline(
             includes=self.shader_includes,
             vertex_shader=load_shader(self.vert_shader_path),
             fragment_shader=load_shader(self.frag_shader_path),
             framebuffer=self.framebuffers,
             resources=self.resources,
             layout=self.layout,
-            blend={
-                "enable": True,
-                "src_color": "src_alpha",
-                "dst_color": "one_minus_src_alpha",
-            },
+            blend=self.blend,
+            depth=self.depth,
             vertex_buffers=[
                 *zengl.bind(self.vertex_buffer, *self.vertex_layout),
-                *zengl.bind(self.instance_buffer, *self.instance_layout),
+                *zengl.bind(
+                    template_cache.placeholder(self.ctx), *self.instance_layout
+                ),
             ],
             vertex_count=self.vertex_buffer.size
             // zengl.calcsize(" ".join([v for v in self.vertex_layout[0].split()])),
         )
-        self.pipeline = self.create_pipeline_from_template(1)
 
-    def create_pipeline_from_template(self, instance_data_size: int) -> zengl.Pipeline:
-        self.instance_buffer = self.ctx.buffer(size=instance_data_size)
+    def create_pipeline_from_template(
+        self, instance_buffer: zengl.Buffer
+    ) -> zengl.Pipeline:
         return self.ctx.pipeline(
             template=self.template_pipeline,
+            resources=self.resources,
+            framebuffer=self.framebuffers,
             vertex_buffers=[
                 *zengl.bind(self.vertex_buffer, *self.vertex_layout),
-                *zengl.bind(self.instance_buffer, *self.instance_layout),
+                *zengl.bind(instance_buffer, *self.instance_layout),
             ],
+            viewport=self.viewport,
         )
 
-    def render(self, instance_data: np.ndarray) -> None:
-        if instance_data.nbytes > self.instance_buffer.size:
-            self.pipeline = self.create_pipeline_from_template(instance_data.nbytes)
-        self.instance_buffer.write(instance_data)
-        self.pipeline.instance_count = instance_data.shape[0]
+    def create_ring(self, instance_capacity: int) -> None:
+        self.instance_buffers = [
+            self.ctx.buffer(size=instance_capacity * self.instance_size)
+            for _ in range(self.ring_depth)
+        ]
+        self.pipelines = [
+            self.create_pipeline_from_template(instance_buffer)
+            for instance_buffer in self.instance_buffers
+        ]
+        # Fresh buffers hold nothing, so every row is pending for each of them.
+        self.pending_rows = np.ones((self.ring_depth, instance_capacity), np.bool_)
+        self.ring_index = 0
+
+    def set_viewport(self, viewport: tuple[int, int, int, int]) -> None:
+        self.viewport = viewport
+        for pipeline in self.pipelines:
+            pipeline.viewport = viewport
+
+    def resize(self, instance_capacity: int) -> None:
+        old_objects: list[zengl.Pipeline | zengl.Buffer] = [
+            *self.pipelines,
+            *self.instance_buffers,
+        ]
+        self.create_ring(instance_capacity)
+        for old_object in old_objects:
+            self.ctx.release(old_object)
+        self.rebuilds += 1
+
+    def write(self, instance_data: np.ndarray, rows: np.ndarray) -> int:
+        """Uploads the changed `rows` plus the rows this buffer missed.
+
+        Returns the number of bytes uploaded.
+        """
+        self.pending_rows[:, rows] = True
+        pending = self.pending_rows[self.ring_index]
+        row_ranges = coalesce_rows(np.flatnonzero(pending))
+        pending[:] = False
+        row_size = instance_data.strides[0]
+        bytes_uploaded = 0
+        for start, stop in row_ranges:
+            data = instance_data[start:stop]
+            self.instance_buffer.write(data, offset=start * row_size)
+            bytes_uploaded += data.nbytes
+        return bytes_uploaded
+
+    def render(self, instance_count: int) -> None:
+        self.pipeline.instance_count = instance_count
         self.pipeline.render()
+        self.ring_index = (self.ring_index + 1) % self.ring_depth
@@ -0,0 +1,36 @@
+from dataclasses import dataclass, field
+
+import numpy as np
+
+
+@dataclass
+class RenderStats:
+    """Per-frame renderer counters for the stats overlay.
+
+    Nothing is collected unless `enabled` is set; the counters then describe
+    the last rendered frame, except `pipeline_rebuilds`, which is a running
+    total. Frame times are kept in a ring of the last `history` frames.
+    """
+
+    enabled: bool = False
+    history: int = 240
+    draw_calls: int = 0
+    instances: dict[str, int] = field(default_factory=dict)
+    culled: int = 0
+    bytes_uploaded: int = 0
+    text_lines_updated: int = 0
+    pipeline_rebuilds: int = 0
+    update_time: float = 0.0
+    render_time: float = 0.0
+    frame_time_percentiles: tuple[float, float, float] = (0.0, 0.0, 0.0)
+
+    def __post_init__(self) -> None:
+        self.frame_times = np.zeros(self.history)
+        self.num_frames = 0
+
+    def add_frame_time(self, frame_time: float) -> None:
+        self.frame_times[self.num_frames % self.history] = frame_time
+        self.num_frames += 1
+        samples = self.frame_times[: min(self.num_frames, self.history)]
+        p50, p95, p99 = np.percentile(samples, (50, 95, 99))
+        self.frame_time_percentiles = (float(p50), float(p95), float(p99))
@@ -1,4 +1,4 @@
-import struct
+import time
 from collections import deque
 from typing import TYPE_CHECKING
 
@@ -8,129 +8,235 @@ if TYPE_CHECKING:
     from webwindow import WebWindow  # type: ignore
 
     from src.window.pygame_window import PygameWindow
+    from src.window.simulation_window import SimulationWindow
 
-from src.rendering.render_group import RenderGroup
-from src.rendering.textures import Textures
+from src.rendering.background_pass import BackgroundPass
+from src.rendering.base import SceneRenderer
+from src.rendering.render_group import WOBBLE_FREQUENCY, CapacityPolicy, RenderGroup
+from src.rendering.render_pipeline import RenderPipeline
+from src.rendering.render_stats import RenderStats
+from src.rendering.textures import (
+    TextureData,
+    TextureMemory,
+    Textures,
+    texture_memory,
+)
+from src.rendering.uniform_block import UniformBlock
 
+# Pre-sized instance capacity per render group, large enough that a normal run
+# never has to grow a buffer mid-game.
+EXPECTED_INSTANCES = {
+    "default": 256,
+    "translucent": 16,
+    "font": 1024,
+}
 
-class Renderer:
-    def __init__(self, window: "WebWindow | PygameWindow") -> None:
+
+class Renderer(SceneRenderer):
+    def __init__(
+        self,
+        window: "PygameWindow | WebWindow | SimulationWindow",
+        expected_instances: dict[str, int] = EXPECTED_INSTANCES,
+        background_scale: float = 1.0,
+        background_refresh_interval: int = 1,
+        render_scale: float = 1.0,
+        max_render_size: tuple[int, int] | None = None,
+        instance_ring_depth: int = 3,
+    ) -> None:
         self.window = window
         self.ctx = zengl.context()
-        self.fbo = self.ctx.image(self.window.size, "rgba8unorm")
+        # Sprites are laid out in `resolution` coordinates and rasterized at
+        # `render_scale` times that into the lower-left corner (the GL origin)
+        # of the framebuffers, which are allocated once at `max_render_size`.
+        self.resolution = tuple(self.window.size)
+        self.render_scale = render_scale
+        self.render_size = self.scaled_size(self.resolution, render_scale)
+        self.camera = (0.0, 0.0)
+        framebuffer_size = max_render_size or self.render_size
+        self.fbo = self.ctx.image(framebuffer_size, "rgba8unorm")
         self.fbo.clear_value = (0.1, 0.2, 0.5, 1.0)
-        self.depth_fbo = self.ctx.image(self.window.size, "depth24plus")
-        self.num_entities = 0
+        self.depth_fbo = self.ctx.image(framebuffer_size, "depth24plus")
+        self._motion_time = 0.0
         self.fps_q: deque[float] = deque(maxlen=100)
+        self.fps_sum = 0.0
         self.avg_fps = 0.0
+        self.stats = RenderStats()
         self.shader_constants_string = f"""
-            const vec2 iResolution = vec2({float(self.window.size[0])}, {float(self.window.size[1])});
-        """
-        self.std140_layout_string = """
-            layout (std140) uniform Common {
-                float iTime;
-            };
+            const float WOBBLE_FREQUENCY = {WOBBLE_FREQUENCY};
         """
+        self.uniforms = UniformBlock(
+            "Common",
+            [
+                ("iTime", "float"),
+                ("iScroll", "float"),
+                ("iMotionTime", "float"),
+                ("iResolution", "vec2"),
+                ("iCamera", "vec2"),
+            ],
+        )
         self.shader_includes = {
-            "uniforms": self.std140_layout_string,
+            "uniforms": self.uniforms.declaration,
             "constants": self.shader_constants_string,
         }
-        self.uniforms_buffer_struct_layout = "1f"
-        self.uniforms_buffer_struct_size = struct.calcsize(
-            self.uniforms_buffer_struct_layout
-        )
-        self.uniform_buffer = self.ctx.buffer(
-            size=16 + self.uniforms_buffer_struct_size
+        self.uniform_buffer = self.uniforms.buffer
+        self.background = BackgroundPass(
+            target=self.fbo,
+            frag_shader_path="src/rendering/shaders/datastream.frag",
+            uniform_buffer=self.uniform_buffer,
+            shader_includes=self.shader_includes,
+            scale=background_scale,
+            refresh_interval=background_refresh_interval,
         )
-        self.textures = Textures()
+        self.expected_instances = expected_instances
+        self.instance_ring_depth = instance_ring_depth
+        # Filled in by `set_textures`; until then only the background is drawn.
+        self.textures: Textures | None = None
+        self.render_groups: dict[str, RenderGroup] = {}
+        self.resize(self.resolution, render_scale)
+
+    @staticmethod
+    def scaled_size(size: tuple[int, int], scale: float) -> tuple[int, int]:
+        return max(1, round(size[0] * scale)), max(1, round(size[1] * scale))
+
+    def resize(
+        self, resolution: tuple[int, int], render_scale: float | None = None
+    ) -> None:
+        """Changes the logical resolution and/or render scale.
+
+        Only viewports and uniforms change; the framebuffers and pipelines are
+        kept, so the scaled size has to fit in the framebuffers.
+        """
+        render_scale = render_scale or self.render_scale
+        render_size = self.scaled_size(resolution, render_scale)
+        if render_size[0] > self.fbo.size[0] or render_size[1] > self.fbo.size[1]:
+            raise ValueError(
+                f"render size {render_size} exceeds the framebuffer size "
+                f"{self.fbo.size}, raise max_render_size"
+            )
+        self.resolution = tuple(resolution)
+        self.render_scale = render_scale
+        self.render_size = render_size
+        self.background.resize(render_size)
+        for render_group in self.render_groups.values():
+            render_group.pipeline.set_viewport((0, 0, *render_size))
+
+    def load_textures(self, data: TextureData) -> None:
+        self.set_textures(Textures(data))
+
+    def set_textures(self, textures: Textures) -> None:
+        """Creates the sprite render groups once the textures are uploaded."""
+        self.textures = textures
+        # Opaque groups come first and write depth; the translucent groups
+        # after them only test it, drawn back-to-front with text on top.
         self.render_groups = {
-            "default": RenderGroup(
-                texture=self.textures.default_texture,
-                vert_shader_path="src/rendering/shaders/default.vert",
-                frag_shader_path="src/rendering/shaders/default.frag",
-                uniform_buffer=self.uniform_buffer,
-                shader_includes=self.shader_includes,
-                framebuffers=[self.fbo, self.depth_fbo],
-            ),
-            "datastream": RenderGroup(
-                texture=None,
-                vert_shader_path="src/rendering/shaders/default.vert",
-                frag_shader_path="src/rendering/shaders/datastream.frag",
-                uniform_buffer=self.uniform_buffer,
-                shader_includes=self.shader_includes,
-                framebuffers=[self.fbo, self.depth_fbo],
-            ),
-            "circuit_board": RenderGroup(
-                texture=self.textures.circuit_board_texture,
-                vert_shader_path="src/rendering/shaders/default.vert",
-                frag_shader_path="src/rendering/shaders/default.frag",
-                uniform_buffer=self.uniform_buffer,
-                shader_includes=self.shader_includes,
-                framebuffers=[self.fbo, self.depth_fbo],
-            ),
-            "font": RenderGroup(
-                texture=self.textures.font_texture,
-                vert_shader_path="src/rendering/shaders/default.vert",
-                frag_shader_path="src/rendering/shaders/default.frag",
-                uniform_buffer=self.uniform_buffer,
-                shader_includes=self.shader_includes,
-                framebuffers=[self.fbo, self.depth_fbo],
+            "default": self.create_render_group(self.textures.atlas.texture, "default"),
+            "translucent": self.create_render_group(
+                self.textures.atlas.texture, "translucent", translucent=True
             ),
-            "ui_panel": RenderGroup(
-                texture=self.textures.ui_panel_texture,
-                vert_shader_path="src/rendering/shaders/default.vert",
-                frag_shader_path="src/rendering/shaders/default.frag",
-                uniform_buffer=self.uniform_buffer,
-                shader_includes=self.shader_includes,
-                framebuffers=[self.fbo, self.depth_fbo],
-            ),
-            "player": RenderGroup(
-                texture=self.textures.robot_texture,
-                vert_shader_path="src/rendering/shaders/default.vert",
-                frag_shader_path="src/rendering/shaders/default.frag",
-                uniform_buffer=self.uniform_buffer,
-                shader_includes=self.shader_includes,
-                framebuffers=[self.fbo, self.depth_fbo],
-            ),
-            "intro_panel": RenderGroup(
-                texture=self.textures.intro_panel_texture,
-                vert_shader_path="src/rendering/shaders/default.vert",
-                frag_shader_path="src/rendering/shaders/default.frag",
-                uniform_buffer=self.uniform_buffer,
-                shader_includes=self.shader_includes,
-                framebuffers=[self.fbo, self.depth_fbo],
+            "font": self.create_render_group(
+                self.textures.font_texture, "font", translucent=True
             ),
         }
-        for obs_id, obs_texture in self.textures.obstacle_textures.items():
-            self.render_groups[obs_id] = RenderGroup(
-                texture=obs_texture,
-                vert_shader_path="src/rendering/shaders/default.vert",
-                frag_shader_path="src/rendering/shaders/default.frag",
-                uniform_buffer=self.uniform_buffer,
-                shader_includes=self.shader_includes,
-                framebuffers=[self.fbo, self.depth_fbo],
-            )
+        for render_group in self.render_groups.values():
+            render_group.pipeline.set_viewport((0, 0, *self.render_size))
+            render_group.motion_time = self._motion_time
+
+    def create_render_group(
+        self, texture: zengl.Image | None, name: str, translucent: bool = False
+    ) -> RenderGroup:
+        capacity_policy = CapacityPolicy(expected=self.expected_instances[name])
+        pipeline = RenderPipeline(
+            texture=texture,
+            vert_shader_path="src/rendering/shaders/default.vert",
+            frag_shader_path="src/rendering/shaders/default.frag",
+            uniform_buffer=self.uniform_buffer,
+            shader_includes=self.shader_includes,
+            framebuffers=[self.fbo, self.depth_fbo],
+            instance_capacity=capacity_policy.expected,
+            translucent=translucent,
+            ring_depth=self.instance_ring_depth,
+        )
+        return RenderGroup(pipeline, self.fbo.size, capacity_policy, translucent)
+
+    @property
+    def motion_time(self) -> float:
+        """Clock of kinematic sprites, owned by the scene so it stops while the
+        game is paused."""
+        return self._motion_time
+
+    @motion_time.setter
+    def motion_time(self, motion_time: float) -> None:
+        self._motion_time = motion_time
+        for render_group in self.render_groups.values():
+            render_group.motion_time = motion_time
+
+    def memory_report(self) -> list[TextureMemory]:
+        """Video memory of every texture and render target the renderer owns."""
+        report = self.textures.memory_report() if self.textures else []
+        report.append(texture_memory("framebuffer", self.fbo))
+        report.append(texture_memory("depth", self.depth_fbo))
+        if self.background.image is not self.fbo:
+            report.append(texture_memory("background", self.background.image))
+        return report
 
     def get_avg_fps(self) -> None:
         ft = self.window.frame_time
         fps = 1 / ft if ft > 0 else 0
+        if len(self.fps_q) == self.fps_q.maxlen:
+            self.fps_sum -= self.fps_q[0]
         self.fps_q.append(fps)
-        self.avg_fps = sum(self.fps_q) / len(self.fps_q)
+        self.fps_sum += fps
+        self.avg_fps = self.fps_sum / len(self.fps_q)
 
-    def write_uniforms(self) -> None:
-        self.uniform_buffer.write(
-            struct.pack(self.uniforms_buffer_struct_layout, self.window.time)
+    def write_uniforms(self) -> int:
+        self.uniforms["iTime"] = self.window.time
+        self.uniforms["iScroll"] = self.background.scroll
+        self.uniforms["iMotionTime"] = self.motion_time
+        self.uniforms["iResolution"] = self.resolution
+        self.uniforms["iCamera"] = self.camera
+        return self.uniforms.upload()
+
+    def update_stats(self, render_time: float) -> None:
+        stats = self.stats
+        groups = self.render_groups.values()
+        stats.draw_calls = self.background.draw_calls + sum(
+            1 for render_group in groups if render_group.num_drawn
         )
+        stats.instances = {
+            name: render_group.num_drawn
+            for name, render_group in self.render_groups.items()
+        }
+        stats.culled = sum(render_group.num_culled for render_group in groups)
+        stats.bytes_uploaded = self.uniforms.size + sum(
+            render_group.bytes_uploaded for render_group in groups
+        )
+        # Text lines are written as one block each.
+        stats.text_lines_updated = self.render_groups["font"].frame_block_writes
+        stats.pipeline_rebuilds = sum(
+            render_group.pipeline.rebuilds for render_group in groups
+        )
+        stats.render_time = render_time
+        stats.add_frame_time(self.window.frame_time)
 
     def render(self) -> None:
+        start = time.perf_counter() if self.stats.enabled else 0.0
+        if tuple(self.window.size) != self.resolution:
+            self.resize(self.window.size)
         self.write_uniforms()
         self.get_avg_fps()
         self.ctx.new_frame()
         self.fbo.clear()
-        self.num_entities = 0
         self.depth_fbo.clear()
+        self.background.render()
+        viewport = (*self.camera, *map(float, self.resolution))
         for render_group in self.render_groups.values():
-            render_group.render()
-            # self.num_entities += render_group.instance_data.shape[0]
-        self.fbo.blit()
+            render_group.viewport = viewport
+            render_group.render(self.motion_time)
+        self.fbo.blit(
+            size=self.window.size,
+            crop=(0, 0, *self.render_size),
+            filter=self.render_size != self.resolution,
+        )
         self.ctx.end_frame()
+        if self.stats.enabled:
+            self.update_stats(time.perf_counter() - start)
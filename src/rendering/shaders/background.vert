@@ -0,0 +1,19 @@
+#version 300 es
+precision highp float;
+
+out vec3 fragCoord;
+
+#include "uniforms"
+
+const vec2 vertices[4] = vec2[](
+    vec2(-1.0, 1.0),  // top-left
+    vec2(1.0, 1.0),  // top-right
+    vec2(-1.0, -1.0),  // bottom-left
+    vec2(1.0, -1.0)  // bottom-right
+);
+
+void main() {
+    vec2 vert = vertices[gl_VertexID];
+    gl_Position = vec4(vert, 0.0, 1.0);
+    fragCoord = vec3(vert.x * 0.5 + 0.5, 0.5 - vert.y * 0.5, 0.0);
+}
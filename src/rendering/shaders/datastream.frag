@@ -57,7 +57,7 @@ float character(float index) {
 
 void main() {
     vec2 grid = CELL_SCALE * CELL_GRID;
-    vec2 pixel = fragCoord.xy;
+    vec2 pixel = vec2(fragCoord.x, fract(fragCoord.y + iScroll));
     vec2 cell = floor(pixel * grid);
     
     float offset = random(cell.x);
@@ -7,13 +7,19 @@ uniform sampler2DArray Texture0;
 layout (location = 0) out vec4 fragColor;
 
 in vec3 fragCoord;
+in vec4 fragTint;
 
 #include "uniforms"
+#include "blending"
 
 void main() {
-    vec4 color = texture(Texture0, fragCoord);
-    if (color.a == 0.0) {
+    vec4 color = texture(Texture0, fragCoord) * fragTint;
+    if (color.a <= ALPHA_CUTOFF) {
         discard;
     }
+#ifdef OPAQUE
+    fragColor = vec4(color.rgb / color.a, 1.0);
+#else
     fragColor = color;
+#endif
 }
\ No newline at end of file
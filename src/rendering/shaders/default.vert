@@ -8,8 +8,12 @@ layout (location = 2) in vec4 in_rect;
 layout (location = 3) in float in_rot;
 layout (location = 4) in float in_tex_idx;
 layout (location = 5) in float in_depth;
+layout (location = 6) in vec4 in_uv;
+layout (location = 7) in vec4 in_motion;
+layout (location = 8) in vec4 in_tint;
 
 out vec3 fragCoord;
+out vec4 fragTint;
 
 #include "constants"
 #include "uniforms"
@@ -41,13 +45,17 @@ Rect rectToNDC(vec4 rect, vec2 screenSize) {
 }
 
 void main() {
-    Rect rect = rectToNDC(in_rect, iResolution);
+    // in_motion: velocity (px/s), launch time, wobble amplitude (degrees).
+    vec2 pos = in_rect.xy + in_motion.xy * (iMotionTime - in_motion.z) - iCamera;
+    float angle = in_rot + in_motion.w * sin(iMotionTime * WOBBLE_FREQUENCY);
+    Rect rect = rectToNDC(vec4(pos, in_rect.zw), iResolution);
     rect.pos.y -= rect.size.y;
     vec2 centeredVert = (in_vert - vec2(0.5, -0.5)) * in_rect.zw;
-    vec2 rotVert = rotate(centeredVert, in_rot);
+    vec2 rotVert = rotate(centeredVert, angle);
     rotVert = (rotVert / in_rect.zw) + vec2(0.5, 0.5);
     float normalizedDepth = (in_depth / 1000.0) - 1.0;
     vec4 ndcPosition = vec4(rect.pos + (rotVert * rect.size), normalizedDepth, 1.0);
     gl_Position = orthoMatrix * ndcPosition;
-    fragCoord = vec3(in_tex, in_tex_idx);
+    fragCoord = vec3(mix(in_uv.xy, in_uv.zw, in_tex), in_tex_idx);
+    fragTint = in_tint;
 }
@@ -1,19 +1,78 @@
+import hashlib
+import json
+import os
+import struct
+import zlib
+from dataclasses import dataclass
+from functools import partial
 from string import printable
+from typing import Callable
 
+import numpy as np
 import pygame
 import zengl
 
+from src.rendering.uniform_block import align
 
-def get_tex_array(surfs: list[pygame.Surface]) -> zengl.Image:
+TEXTURE_PACK_PATH = "src/assets/textures.pack"
+TEXTURE_PACK_MAGIC = b"DDTP"
+# Bump when the way textures are built changes, so existing packs go stale.
+TEXTURE_PACK_VERSION = 2
+TEXTURE_SOURCES = [
+    "src/assets/circuit_board.png",
+    "src/assets/robot.png",
+    *(f"src/assets/obstacle_{i}.png" for i in range(1, 8)),
+    "src/assets/RobotoMono-Bold.ttf",
+]
+
+
+def surf_to_array(surf: pygame.Surface) -> np.ndarray:
+    width, height = surf.get_size()
+    pixels = np.frombuffer(pygame.image.tobytes(surf, "RGBA", False), np.uint8)
+    return pixels.reshape(height, width, 4)
+
+
+def create_texture_array(layers: np.ndarray) -> zengl.Image:
+    """Uploads (layers, height, width, 4) RGBA8 data as a mipmapped array."""
     ctx = zengl.context()
-    size = surfs[0].get_size()
-    texture = ctx.image(size, "rgba8unorm", array=len(surfs))
-    for idx, surf in enumerate(surfs):
-        texture.write(pygame.image.tobytes(surf, "RGBA", False), layer=idx)
+    num_layers, height, width, _ = layers.shape
+    texture = ctx.image((width, height), "rgba8unorm", array=num_layers)
+    for idx in range(num_layers):
+        texture.write(layers[idx], layer=idx)
     texture.mipmaps()
     return texture
 
 
+def mip_levels(size: tuple[int, int]) -> int:
+    return max(size).bit_length()
+
+
+@dataclass
+class TextureMemory:
+    name: str
+    size: tuple[int, int]
+    layers: int
+    mip_levels: int
+    bytes: int
+
+
+def texture_memory(
+    name: str, image: zengl.Image, pixel_size: int = 4, mipmapped: bool = False
+) -> TextureMemory:
+    """Estimates the video memory of `image`, including its mip chain."""
+    width, height = image.size
+    layers = max(image.array, 1)
+    levels = mip_levels(image.size) if mipmapped else 1
+    texels = sum(
+        max(width >> level, 1) * max(height >> level, 1) for level in range(levels)
+    )
+    return TextureMemory(name, image.size, layers, levels, texels * layers * pixel_size)
+
+
+def get_tex_array(surfs: list[pygame.Surface]) -> zengl.Image:
+    return create_texture_array(np.stack([surf_to_array(surf) for surf in surfs]))
+
+
 def load_ttf_font(
     path: str, font_size: int
 ) -> tuple[list[pygame.Surface], dict[str, int]]:
@@ -32,72 +91,330 @@ def load_ttf_font(
     return glyphs, idx_map
 
 
-class Textures:
-    def __init__(self) -> None:
-        button_surf_1 = pygame.Surface((255, 255), pygame.SRCALPHA)
-        button_surf_1.fill((255, 0, 0))
-        button_surf_2 = pygame.Surface((255, 255), pygame.SRCALPHA)
-        button_surf_2.fill((55, 155, 0))
-        button_surf_3 = pygame.Surface((255, 255), pygame.SRCALPHA)
-        button_surf_3.fill((55, 55, 55))
-        surfs = [button_surf_1, button_surf_2, button_surf_3]
-        for surf in surfs:
-            pygame.draw.rect(surf, (0, 0, 0), surf.get_rect(), 10)
-        self.default_texture = get_tex_array(surfs)
-        circuit_board_img_1 = pygame.image.load("src/assets/circuit_board.png")
-        circuit_board_img_1.set_colorkey((0, 0, 0))
-        circuit_board_img_2 = pygame.transform.flip(circuit_board_img_1, True, False)
-        circuit_board_img_3 = pygame.transform.flip(circuit_board_img_1, False, True)
-        circuit_board_img_4 = pygame.transform.flip(circuit_board_img_2, False, True)
-        self.circuit_board_texture = get_tex_array(
-            [
-                circuit_board_img_1,
-                circuit_board_img_2,
-                circuit_board_img_3,
-                circuit_board_img_4,
-            ]
+def glyph_table(font_idx_map: dict[str, int]) -> np.ndarray:
+    """Maps character codes below 128 to font layers (-1 for no glyph)."""
+    table = np.full(128, -1, dtype=np.int32)
+    table[[ord(char) for char in font_idx_map]] = list(font_idx_map.values())
+    return table
+
+
+@dataclass
+class AtlasRegion:
+    layer: int
+    uv: tuple[float, float, float, float]
+    size: tuple[int, int]
+
+
+class TextureAtlas:
+    """Shelf-packs images into the layers of one sampler2DArray.
+
+    Sprites select their image through `tex_idx` (the layer) and a per-instance
+    uv rect, so every image in the atlas can be drawn by the same pipeline.
+    """
+
+    def __init__(
+        self, pages: np.ndarray, regions: dict[str, AtlasRegion], upload: bool = True
+    ) -> None:
+        _, page_height, page_width, _ = pages.shape
+        self.size = (page_width, page_height)
+        self.regions = regions
+        self.texture = create_texture_array(pages) if upload else None
+
+    @staticmethod
+    def pack(
+        surfs: dict[str, pygame.Surface],
+        max_size: int = 2048,
+        padding: int = 16,
+    ) -> tuple[np.ndarray, dict[str, AtlasRegion]]:
+        placements: dict[str, tuple[int, int, int]] = {}
+        layer, x, y, shelf_height = 0, padding, padding, 0
+        for name in sorted(surfs, key=lambda n: surfs[n].get_height(), reverse=True):
+            width, height = surfs[name].get_size()
+            if width + 2 * padding > max_size or height + 2 * padding > max_size:
+                raise ValueError(f"Image '{name}' does not fit in a {max_size} atlas")
+            if x + width + padding > max_size:
+                x, y, shelf_height = padding, y + shelf_height + padding, 0
+            if y + height + padding > max_size:
+                layer, x, y, shelf_height = layer + 1, padding, padding, 0
+            placements[name] = (layer, x, y)
+            x += width + padding
+            shelf_height = max(shelf_height, height)
+
+        num_layers = layer + 1
+        page_height = max_size if num_layers > 1 else y + shelf_height + padding
+        pages = np.zeros((num_layers, page_height, max_size, 4), dtype=np.uint8)
+        regions: dict[str, AtlasRegion] = {}
+        for name, (layer, x, y) in placements.items():
+            width, height = surfs[name].get_size()
+            pages[layer, y : y + height, x : x + width] = surf_to_array(surfs[name])
+            regions[name] = AtlasRegion(
+                layer=layer,
+                uv=(
+                    x / max_size,
+                    y / page_height,
+                    (x + width) / max_size,
+                    (y + height) / page_height,
+                ),
+                size=(width, height),
+            )
+        return pages, regions
+
+    def __getitem__(self, name: str) -> AtlasRegion:
+        return self.regions[name]
+
+
+@dataclass
+class TextureData:
+    """CPU-side result of preparing the game's textures, ready for upload."""
+
+    atlas_pages: np.ndarray
+    atlas_regions: dict[str, AtlasRegion]
+    font_layers: np.ndarray
+    font_idx_map: dict[str, int]
+    robot_img_size: tuple[int, int]
+    obstacle_sizes: dict[str, tuple[int, int]]
+    intro_panel_size: tuple[int, int]
+
+
+def source_hash() -> str:
+    """Fingerprint of everything a texture pack is baked from."""
+    digest = hashlib.sha256(str(TEXTURE_PACK_VERSION).encode())
+    for path in TEXTURE_SOURCES:
+        with open(path, "rb") as file:
+            digest.update(file.read())
+    return digest.hexdigest()
+
+
+def save_texture_pack(path: str, data: TextureData, compress: bool = False) -> None:
+    """Writes `data` as a texture pack.
+
+    Layout: magic, header length (u32), JSON header, then the atlas pages and
+    the font layers as RGBA8 at 16-byte aligned offsets from the end of the
+    header. Raw packs can be memory-mapped; `compress` zlib-compresses the
+    layers instead, which is the better trade where the pack is downloaded.
+    The pack is written next to `path` and moved into place once complete.
+    """
+    blobs = [
+        zlib.compress(layers.tobytes()) if compress else layers.tobytes()
+        for layers in (np.ascontiguousarray(data.atlas_pages), data.font_layers)
+    ]
+    shapes = [data.atlas_pages.shape, data.font_layers.shape]
+    blob_entries: list[tuple[int, int, list[int]]] = []
+    offset = 0
+    for blob, shape in zip(blobs, shapes):
+        blob_entries.append((offset, len(blob), list(shape)))
+        offset = align(offset + len(blob), 16)
+    header = json.dumps(
+        {
+            "source_hash": source_hash(),
+            "atlas_regions": {
+                name: [region.layer, region.uv, region.size]
+                for name, region in data.atlas_regions.items()
+            },
+            "font_idx_map": data.font_idx_map,
+            "robot_img_size": data.robot_img_size,
+            "obstacle_sizes": data.obstacle_sizes,
+            "intro_panel_size": data.intro_panel_size,
+            "compressed": compress,
+            "blobs": blob_entries,
+        }
+    ).encode()
+    data_start = align(len(TEXTURE_PACK_MAGIC) + 4 + len(header), 16)
+
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "wb") as file:
+        file.write(TEXTURE_PACK_MAGIC)
+        file.write(struct.pack("<I", len(header)))
+        file.write(header)
+        for (offset, _, _), blob in zip(blob_entries, blobs):
+            file.write(bytes(data_start + offset - file.tell()))
+            file.write(blob)
+    os.replace(temp_path, path)
+
+
+def read_texture_pack(path: str) -> np.ndarray:
+    try:
+        return np.memmap(path, dtype=np.uint8, mode="r")
+    except ImportError:
+        # No mmap support (e.g. in the browser); read the file instead.
+        return np.fromfile(path, dtype=np.uint8)
+
+
+def load_texture_pack(path: str) -> TextureData | None:
+    """Maps a texture pack, or returns None if it is missing, stale or damaged."""
+    try:
+        return parse_texture_pack(read_texture_pack(path))
+    except (
+        OSError,
+        ValueError,
+        TypeError,
+        AttributeError,
+        struct.error,
+        KeyError,
+        zlib.error,
+    ):
+        return None
+
+
+def parse_texture_pack(buffer: np.ndarray) -> TextureData | None:
+    header_start = len(TEXTURE_PACK_MAGIC) + 4
+    if bytes(buffer[: len(TEXTURE_PACK_MAGIC)]) != TEXTURE_PACK_MAGIC:
+        return None
+    (header_size,) = struct.unpack("<I", bytes(buffer[header_start - 4 : header_start]))
+    header = json.loads(bytes(buffer[header_start : header_start + header_size]))
+    if header["source_hash"] != source_hash():
+        return None
+    data_start = align(header_start + header_size, 16)
+    atlas_pages, font_layers = (
+        np.frombuffer(zlib.decompress(blob.tobytes()), np.uint8).reshape(shape)
+        if header["compressed"]
+        else blob.reshape(shape)
+        for blob, shape in (
+            (buffer[data_start + offset :][:size], shape)
+            for offset, size, shape in header["blobs"]
         )
-        font_glyphs, self.font_idx_map = load_ttf_font(
-            "src/assets/RobotoMono-Bold.ttf", 32
+    )
+    return TextureData(
+        atlas_pages=atlas_pages,
+        atlas_regions={
+            name: AtlasRegion(layer=layer, uv=tuple(uv), size=tuple(size))
+            for name, (layer, uv, size) in header["atlas_regions"].items()
+        },
+        font_layers=font_layers,
+        font_idx_map=header["font_idx_map"],
+        robot_img_size=tuple(header["robot_img_size"]),
+        obstacle_sizes={
+            name: tuple(size) for name, size in header["obstacle_sizes"].items()
+        },
+        intro_panel_size=tuple(header["intro_panel_size"]),
+    )
+
+
+class Textures:
+    """Uploads the game's textures.
+
+    `data` comes from an `AssetLoader`; without it the baked pack at
+    `pack_path` (see `scripts.bake_assets`) is used when it matches the current
+    sources, and otherwise everything is built from the source assets. Without
+    `upload` only the layout (regions, sizes and glyphs) is kept, for running
+    the game without a GL context.
+    """
+
+    def __init__(
+        self,
+        data: TextureData | None = None,
+        pack_path: str = TEXTURE_PACK_PATH,
+        upload: bool = True,
+    ) -> None:
+        data = data or load_texture_pack(pack_path) or self.build()
+        self.atlas = TextureAtlas(data.atlas_pages, data.atlas_regions, upload)
+        self.font_texture = create_texture_array(data.font_layers) if upload else None
+        self.font_idx_map = data.font_idx_map
+        self.font_glyph_table = glyph_table(data.font_idx_map)
+        self.font_size = (data.font_layers.shape[2], data.font_layers.shape[1])
+        self.robot_img_size = data.robot_img_size
+        self.obstacle_sizes = data.obstacle_sizes
+        self.intro_panel_size = data.intro_panel_size
+
+    def memory_report(self) -> list[TextureMemory]:
+        textures = (("atlas", self.atlas.texture), ("font", self.font_texture))
+        # Textures loaded without uploading have no images to report.
+        return [
+            texture_memory(name, texture, mipmapped=True)
+            for name, texture in textures
+            if texture is not None
+        ]
+
+    @classmethod
+    def decode_jobs(cls) -> list[Callable[[], dict[str, pygame.Surface]]]:
+        """Independent jobs that each decode some of the atlas images.
+
+        The results are merged in job order, which keeps the atlas layout the
+        same however the jobs are scheduled.
+        """
+        return [
+            cls.create_button_surfs,
+            cls.load_circuit_board_surfs,
+            cls.create_ui_panel_surfs,
+            cls.load_robot_surfs,
+            *(partial(cls.load_obstacle_surfs, idx) for idx in range(7)),
+        ]
+
+    @staticmethod
+    def load_font() -> tuple[list[pygame.Surface], dict[str, int]]:
+        return load_ttf_font("src/assets/RobotoMono-Bold.ttf", 32)
+
+    @classmethod
+    def build(cls) -> TextureData:
+        atlas_surfs: dict[str, pygame.Surface] = {}
+        for job in cls.decode_jobs():
+            atlas_surfs.update(job())
+        return cls.assemble(atlas_surfs, *cls.load_font())
+
+    @classmethod
+    def assemble(
+        cls,
+        atlas_surfs: dict[str, pygame.Surface],
+        font_glyphs: list[pygame.Surface],
+        font_idx_map: dict[str, int],
+    ) -> TextureData:
+        # The intro panel is rendered with the font, so it waits for the font
+        # job instead of running next to it (SDL_ttf is not thread-safe).
+        intro_panel_surf = cls.create_intro_panel_surf()
+        atlas_surfs = {**atlas_surfs, "intro_panel": intro_panel_surf}
+        atlas_pages, atlas_regions = TextureAtlas.pack(atlas_surfs)
+        return TextureData(
+            atlas_pages=atlas_pages,
+            atlas_regions=atlas_regions,
+            font_layers=np.stack([surf_to_array(glyph) for glyph in font_glyphs]),
+            font_idx_map=font_idx_map,
+            robot_img_size=atlas_surfs["robot"].get_size(),
+            obstacle_sizes={
+                f"obstacle_texture_{idx}": atlas_surfs[
+                    f"obstacle_texture_{idx}"
+                ].get_size()
+                for idx in range(7)
+            },
+            intro_panel_size=intro_panel_surf.get_size(),
         )
-        self.font_size = font_glyphs[0].get_size()
-        self.font_texture = get_tex_array(font_glyphs)
+
+    @staticmethod
+    def create_button_surfs() -> dict[str, pygame.Surface]:
+        # White, so sprites color it with their tint.
+        surf = pygame.Surface((255, 255), pygame.SRCALPHA)
+        surf.fill((255, 255, 255))
+        pygame.draw.rect(surf, (0, 0, 0), surf.get_rect(), 10)
+        return {"button": surf}
+
+    @staticmethod
+    def load_circuit_board_surfs() -> dict[str, pygame.Surface]:
+        # The mirrored copies are drawn with the sprites' flip instead.
+        circuit_board_img = pygame.image.load("src/assets/circuit_board.png")
+        circuit_board_img.set_colorkey((0, 0, 0))
+        return {"circuit_board": circuit_board_img}
+
+    @staticmethod
+    def create_ui_panel_surfs() -> dict[str, pygame.Surface]:
         ui_panel_img = pygame.Surface((255, 255), pygame.SRCALPHA)
         pygame.draw.rect(ui_panel_img, (0, 0, 0, 200), ui_panel_img.get_rect())
-        self.ui_panel_texture = get_tex_array([ui_panel_img])
+        return {"ui_panel": ui_panel_img}
 
+    @staticmethod
+    def load_robot_surfs() -> dict[str, pygame.Surface]:
         robot_img = pygame.image.load("src/assets/robot.png")
         robot_img_scaled = pygame.transform.scale_by(robot_img, 2.5)
         robot_img_scaled.set_colorkey((255, 255, 255))
-        self.robot_texture = get_tex_array([robot_img_scaled])
-        self.robot_img_size = robot_img_scaled.get_size()
-
-        obstacle_img_paths = [
-            "src/assets/obstacle_1.png",
-            "src/assets/obstacle_2.png",
-            "src/assets/obstacle_3.png",
-            "src/assets/obstacle_4.png",
-            "src/assets/obstacle_5.png",
-            "src/assets/obstacle_6.png",
-            "src/assets/obstacle_7.png",
-        ]
-        self.obstacle_sizes = {}
-        self.obstacle_textures = {}
-        for idx, img_path in enumerate(obstacle_img_paths):
-            surf = pygame.image.load(img_path)
-            surf = pygame.transform.scale_by(surf, 0.5)
-            surf.set_colorkey((255, 255, 255))
-            self.obstacle_textures.update(
-                {f"obstacle_texture_{idx}": get_tex_array([surf])}
-            )
-            self.obstacle_sizes.update({f"obstacle_texture_{idx}": surf.get_size()})
+        return {"robot": robot_img_scaled}
 
-        self.intro_panel_texture, self.intro_panel_size = (
-            self.create_intro_panel_texture()
-        )
+    @staticmethod
+    def load_obstacle_surfs(idx: int) -> dict[str, pygame.Surface]:
+        surf = pygame.image.load(f"src/assets/obstacle_{idx + 1}.png")
+        surf = pygame.transform.scale_by(surf, 0.5)
+        surf.set_colorkey((255, 255, 255))
+        return {f"obstacle_texture_{idx}": surf}
 
     @staticmethod
-    def create_intro_panel_texture() -> tuple[zengl.Image, tuple[int, int]]:
+    def create_intro_panel_surf() -> pygame.Surface:
         surf = pygame.Surface((1400, 600), pygame.SRCALPHA)
         pygame.draw.rect(surf, (0, 0, 0, 200), surf.get_rect())
         text = (
@@ -116,4 +433,4 @@ class Textures:
         font = pygame.font.Font("src/assets/RobotoMono-Bold.ttf", 32)
         text_surf = font.render(text, True, (255, 255, 255))
         surf.blit(text_surf, (10, 10))
-        return get_tex_array([surf]), surf.get_size()
+        return surf
@@ -0,0 +1,64 @@
+import numpy as np
+import zengl
+
+# GLSL type -> (numpy format, base alignment, size) under the std140 rules.
+STD140_TYPES: dict[str, tuple[str | tuple[str, tuple[int, ...]], int, int]] = {
+    "float": ("f4", 4, 4),
+    "int": ("i4", 4, 4),
+    "vec2": (("f4", (2,)), 8, 8),
+    "vec3": (("f4", (3,)), 16, 12),
+    "vec4": (("f4", (4,)), 16, 16),
+    "mat4": (("f4", (4, 4)), 16, 64),
+}
+
+
+def align(offset: int, alignment: int) -> int:
+    return -(-offset // alignment) * alignment
+
+
+class UniformBlock:
+    """A std140 uniform block mirrored by a numpy structured record.
+
+    The GLSL declaration and the record dtype are generated from the same
+    `fields` list, so the shader and CPU layouts cannot drift apart. Values
+    are set by name and reach the GPU in a single `upload`.
+    """
+
+    def __init__(self, name: str, fields: list[tuple[str, str]]) -> None:
+        self.name = name
+        self.fields = fields
+        offsets = []
+        offset = 0
+        for _, glsl_type in fields:
+            _, alignment, size = STD140_TYPES[glsl_type]
+            offset = align(offset, alignment)
+            offsets.append(offset)
+            offset += size
+        self.size = align(offset, 16)
+        self.dtype = np.dtype(
+            {
+                "names": [field_name for field_name, _ in fields],
+                "formats": [STD140_TYPES[glsl_type][0] for _, glsl_type in fields],
+                "offsets": offsets,
+                "itemsize": self.size,
+            }
+        )
+        self.data = np.zeros((), dtype=self.dtype)
+        self.buffer = zengl.context().buffer(size=self.size)
+
+    @property
+    def declaration(self) -> str:
+        members = "".join(
+            f"    {glsl_type} {field_name};\n" for field_name, glsl_type in self.fields
+        )
+        return f"layout (std140) uniform {self.name} {{\n{members}}};\n"
+
+    def __getitem__(self, field_name: str) -> np.ndarray:
+        return self.data[field_name]
+
+    def __setitem__(self, field_name: str, value: float | tuple[float, ...]) -> None:
+        self.data[field_name] = value
+
+    def upload(self) -> int:
+        self.buffer.write(self.data.tobytes())
+        return self.size
@@ -1,20 +1,38 @@
 import random
 from dataclasses import dataclass
-from typing import TYPE_CHECKING, Callable
+from typing import TYPE_CHECKING, Any, Callable, Literal
 
 import numpy as np
 
+from src.broadphase import UniformGrid
 from src.entities.projectiles import Projectiles
 from src.entities.sprite import Sprite
-from src.entities.text_line import TextLine
+from src.entities.text_line import TextBinding, TextLine
+from src.rendering.render_group import SIZE_COLUMNS
 from src.timer import Timer
 from src.window.inputs_map import Inputs
 
 if TYPE_CHECKING:
-    from src.rendering.renderer import Renderer
+    import pygame
+
+    from src.rendering.base import SceneRenderer
     from src.window.audio.base import Audio
 
 
+SOUNDS = {
+    "explosion": "src/assets/sfx/explosion.ogg",
+    "shoot": "src/assets/sfx/laserShoot.ogg",
+    "power_up": "src/assets/sfx/pickupCoin.ogg",
+    "hurt": "src/assets/sfx/hitHurt.ogg",
+}
+MUSIC = {"music": "src/assets/sfx/Galactic Lights.ogg"}
+BUTTON_TINTS = {
+    "red": (1.0, 0.0, 0.0, 1.0),
+    "green": (55 / 255, 155 / 255, 0.0, 1.0),
+    "gray": (55 / 255, 55 / 255, 55 / 255, 1.0),
+}
+
+
 @dataclass
 class LevelData:
     datastream_speed: int
@@ -57,20 +75,41 @@ LEVELS = {
 
 
 class Scene:
-    def __init__(self, renderer: "Renderer", audio: "Audio") -> None:
+    def __init__(
+        self,
+        renderer: "SceneRenderer",
+        audio: "Audio",
+        sfx: dict | None = None,
+        seed: int | None = None,
+    ) -> None:
         self.renderer = renderer
+        # All gameplay randomness comes from here, so a seed replays a run.
+        self.random = random.Random(seed)
         self.audio = audio
-        self.load_sfx()
+        # A caller streaming the sounds in passes the dict it fills.
+        if sfx is None:
+            self.load_sfx()
+        else:
+            self.sfx = sfx
+        # Fraction of the assets loaded, shown on the intro panel.
+        self.asset_progress = 1.0
         self.window = renderer.window
         self.render_groups = renderer.render_groups
+        if renderer.textures is None:
+            raise ValueError("the renderer's textures must be set before the scene")
+        self.textures = renderer.textures
+        self.atlas = self.textures.atlas
         self.music_started = False
         self.paused = True
         self.power_ups_panel_active = False
         self.intro_panel_active = True
         self.game_over = False
         self.game_over_panel_active = False
+        self.stats_overlay_active = False
         self.time = 0.0
-        self.money = 0
+        # Length of the last step, which `interpolate` blends across.
+        self.step_time = 0.0
+        self.money = 0.0
         self.current_level = 1
         self.max_move_speed = 1000
         self.score = 0
@@ -85,9 +124,33 @@ class Scene:
         self.ui_panel_height = self.window.size[1] / 8
         self.circuit_board_width = self.window.size[0] // 8
         self.circuit_board_speed = self.datastream_speed / 8
-        self.obstacles: list[Sprite] = []
+        # Keyed by slot in the default group, whose arrays hold their state.
+        self.obstacles: dict[int, Sprite] = {}
         self.timers: dict[str, Timer] = {}
-        self.collided_obstacles: list[Sprite] = []
+        self.collided_obstacles: set[Sprite] = set()
+        # Obstacle boxes of the frame, indexed for the collision checks.
+        self.obstacle_grid = UniformGrid(
+            (
+                self.circuit_board_width,
+                0,
+                self.window.size[0] - 2 * self.circuit_board_width,
+                self.window.size[1],
+            )
+        )
+        self.obstacle_slots = np.empty(0, dtype=np.int64)
+        self.text_lines: list[TextLine] = []
+        # Set up by `create_entities`.
+        self.player: Sprite
+        self.left_circuit_board_bg_1: Sprite
+        self.left_circuit_board_bg_2: Sprite
+        self.right_circuit_board_bg_1: Sprite
+        self.right_circuit_board_bg_2: Sprite
+        self.datastream_scroll = 0.0
+        self.previous_scroll = 0.0
+        # Sprites moved on the CPU, which `interpolate` blends between steps.
+        self.interpolated: list[Sprite] = []
+        self.previous_positions: list[pygame.Vector2] = []
+        self.step_positions: list[pygame.Vector2] = []
         self.projectiles = Projectiles(self)
         self.create_entities()
         self.add_timer("add_obstacle", self.obstacles_freq, 0, self.add_obstacle)
@@ -96,19 +159,24 @@ class Scene:
         )
 
     def load_sfx(self) -> None:
-        self.sfx = {
-            "explosion": self.audio.load_sound("src/assets/sfx/explosion.ogg"),
-            "shoot": self.audio.load_sound("src/assets/sfx/laserShoot.ogg"),
-            "power_up": self.audio.load_sound("src/assets/sfx/pickupCoin.ogg"),
-            "hurt": self.audio.load_sound("src/assets/sfx/hitHurt.ogg"),
-            "music": self.audio.load_music("src/assets/sfx/Galactic Lights.ogg"),
-        }
+        self.sfx = {name: self.audio.load_sound(path) for name, path in SOUNDS.items()}
+        self.sfx.update(
+            {name: self.audio.load_music(path) for name, path in MUSIC.items()}
+        )
+
+    def play_sound(self, name: str) -> None:
+        # Sounds that are still loading are skipped.
+        if name in self.sfx:
+            self.audio.play_sound(self.sfx[name])
 
     def update(self):
+        self.restore_positions()
         self.update_controls()
+        self.update_stats_overlay()
+        self.update_loading_text()
         if self.intro_panel_active:
             return
-        if not self.music_started:
+        if not self.music_started and "music" in self.sfx:
             self.audio.play_music(self.sfx["music"])
             self.music_started = True
         self.update_game_over_panel()
@@ -125,48 +193,85 @@ class Scene:
         self.update_ui_texts()
         self.update_intro_panel()
         self.update_power_ups_panel()
-        if self.paused:
+
+    def step(self, dt: float) -> None:
+        """Advances the game by `dt` seconds.
+
+        The app calls this at a fixed rate, zero or more times per frame after
+        `update`, which handles the input and panels once per frame.
+        """
+        if self.paused or self.player.health <= 0:
             return
-        self.time += self.window.frame_time
-        self.money += self.window.frame_time
-        self.update_timers()
-        self.update_bg(
-            self.datastream_bg_1, self.datastream_bg_2, self.datastream_speed
-        )
+        self.previous_positions = [sprite.pos for sprite in self.interpolated]
+        self.previous_scroll = self.datastream_scroll
+        self.step_time = dt
+        self.time += dt
+        self.renderer.motion_time = self.time
+        self.money += dt
+        self.update_timers(dt)
+        self.update_datastream_scroll(dt)
         self.update_bg(
             self.left_circuit_board_bg_1,
             self.left_circuit_board_bg_2,
             self.circuit_board_speed,
+            dt,
         )
         self.update_bg(
             self.right_circuit_board_bg_1,
             self.right_circuit_board_bg_2,
             self.circuit_board_speed,
+            dt,
         )
         self.update_obstacles()
-        self.update_player()
+        self.update_obstacle_grid()
+        self.update_player(dt)
         self.update_player_collisions()
-        self.update_projectiles()
+        self.update_projectiles(dt)
+
+    def interpolate(self, alpha: float) -> None:
+        """Draws the game `alpha` of a step past the previous step.
+
+        Kinematic sprites and the datastream follow the clock. Sprites moved
+        on the CPU are blended between their last two positions and put back
+        by `restore_positions` before the game advances again.
+        """
+        self.renderer.motion_time = self.time - (1 - alpha) * self.step_time
+        scroll_delta = (self.datastream_scroll - self.previous_scroll) % 1
+        self.renderer.background.scroll = (
+            self.previous_scroll + scroll_delta * alpha
+        ) % 1
+        self.step_positions = [sprite.pos for sprite in self.interpolated]
+        for sprite, previous, current in zip(
+            self.interpolated, self.previous_positions, self.step_positions
+        ):
+            # Wrapping backgrounds jump a whole screen; those are not blended.
+            if previous != current and (current - previous).length() < sprite.size.y:
+                sprite.set_pos(previous.lerp(current, alpha))
+
+    def restore_positions(self) -> None:
+        for sprite, pos in zip(self.interpolated, self.step_positions):
+            sprite.set_pos(pos)
+        self.step_positions = []
+        self.renderer.motion_time = self.time
 
     def update_game_over_panel(self) -> None:
         if self.game_over_panel_active:
-            self.game_over_panel.set_size(self.game_over_panel_size)
+            self.game_over_panel.visible = True
             for text in self.game_over_texts:
                 text.visible = True
                 text.update()
         else:
-            self.game_over_panel.set_size((0, 0))
+            self.game_over_panel.visible = False
 
     def update_intro_panel(self) -> None:
         if self.intro_panel_active:
-            self.intro_panel.set_size(self.renderer.textures.intro_panel_size)
+            self.intro_panel.visible = True
             self.paused = True
         else:
-            self.intro_panel.set_size((0, 0))
+            self.intro_panel.visible = False
             self.paused = False
 
-    def update_player(self) -> None:
-        dt = self.window.frame_time
+    def update_player(self, dt: float) -> None:
         dx, dy = 0, 0
         if self.window.key_down(Inputs.ArrowUp):
             dy = -1
@@ -178,21 +283,17 @@ class Scene:
             dx = 1
         self.player.move(dx, dy, dt)
 
-        if self.player.pos.x < self.circuit_board_width:
-            self.player.pos.x = self.circuit_board_width
-        elif (
-            self.player.pos.x
-            > self.window.size[0] - self.circuit_board_width - self.player.size.x
-        ):
-            self.player.pos.x = (
-                self.window.size[0] - self.circuit_board_width - self.player.size.x
-            )
-        if self.player.pos.y < self.ui_panel_height:
-            self.player.pos.y = self.ui_panel_height
-        elif self.player.pos.y > self.window.size[1] - self.player.size.y:
-            self.player.pos.y = self.window.size[1] - self.player.size.y
+        pos, size = self.player.pos, self.player.size
+        if pos.x < self.circuit_board_width:
+            pos.x = self.circuit_board_width
+        elif pos.x > self.window.size[0] - self.circuit_board_width - size.x:
+            pos.x = self.window.size[0] - self.circuit_board_width - size.x
+        if pos.y < self.ui_panel_height:
+            pos.y = self.ui_panel_height
+        elif pos.y > self.window.size[1] - size.y:
+            pos.y = self.window.size[1] - size.y
 
-        self.player.set_pos(self.player.pos)
+        self.player.set_pos(pos)
 
     def restart_game(self) -> None:
         self.score = 0
@@ -202,16 +303,24 @@ class Scene:
         self.final_score = 0
         self.game_over = False
         self.game_over_panel_active = False
-        for render_group in self.render_groups.values():
-            render_group.sprites.clear()
+        # Text goes back to the font group's glyph pool, which the new text
+        # lines draw from; everything else is dropped.
+        for text in self.text_lines:
+            text.delete()
+        self.text_lines.clear()
+        for name, render_group in self.render_groups.items():
+            if name != "font":
+                render_group.clear()
         self.obstacles.clear()
         self.collided_obstacles.clear()
+        self.update_obstacle_grid()
         self.timers.clear()
-        self.projectiles.active_projectiles.clear()
+        self.projectiles.clear()
         self.create_entities()
-        self.time = 0
+        self.time = 0.0
+        self.step_time = 0.0
         self.intro_panel_active = True
-        self.money = 0
+        self.money = 0.0
         self.current_level = 1
         self.datastream_speed = LEVELS[self.current_level].datastream_speed
         self.obstacles_speed_range = LEVELS[self.current_level].obstacles_speed_range
@@ -236,73 +345,91 @@ class Scene:
             self.paused = not self.paused
         if self.window.key_pressed(Inputs.KeyF):
             self.power_ups_panel_active = not self.power_ups_panel_active
+        if self.window.key_pressed(Inputs.F3):
+            self.stats_overlay_active = not self.stats_overlay_active
+            self.renderer.stats.enabled = self.stats_overlay_active
 
         if self.power_ups_panel_active:
             if self.window.key_pressed(Inputs.Digit1):
                 if self.money >= 50 and self.player.speed < self.max_move_speed:
                     self.player.speed *= 1.1
                     self.money -= 50
-                    self.audio.play_sound(self.sfx["power_up"])
+                    self.play_sound("power_up")
             if self.window.key_pressed(Inputs.Digit2):
                 if self.money >= 50:
                     self.projectiles.cd_duration *= 0.9
                     self.money -= 50
-                    self.audio.play_sound(self.sfx["power_up"])
+                    self.play_sound("power_up")
             if self.window.key_pressed(Inputs.Digit3):
                 if self.money >= 100:
                     self.player.health = 100
                     self.money -= 100
-                    self.audio.play_sound(self.sfx["power_up"])
+                    self.play_sound("power_up")
             if self.window.key_pressed(Inputs.Space):
                 self.power_ups_panel_active = False
                 self.projectiles.cd_timer = 0.5
 
     def update_power_ups_panel(self):
         if self.power_ups_panel_active:
-            self.power_ups_panel.set_size(self.power_ups_panel_size)
+            self.power_ups_panel.visible = True
             for button in self.power_up_buttons:
-                button.set_size(self.power_up_button_size)
+                button.visible = True
                 if (
                     button.name == "move_speed"
                     and (self.player.speed) >= self.max_move_speed
                 ):
-                    button.tex_idx = 2
+                    button.tint = BUTTON_TINTS["gray"]
                 elif self.money >= button.cost:
-                    button.tex_idx = 1
+                    button.tint = BUTTON_TINTS["green"]
                 else:
-                    button.tex_idx = 0
+                    button.tint = BUTTON_TINTS["red"]
             for text in self.power_up_texts:
                 text.visible = True
                 text.update()
             self.paused = True
         else:
-            self.power_ups_panel.set_size((0, 0))
+            self.power_ups_panel.visible = False
             for button in self.power_up_buttons:
-                button.set_size((0, 0))
+                button.visible = False
             for text in self.power_up_texts:
                 text.visible = False
                 text.update()
             self.paused = False
 
-    def update_projectiles(self) -> None:
-        self.projectiles.update(self.player, self.window.frame_time)
-        projs_to_remove: list[Sprite] = []
-        for proj in self.projectiles.active_projectiles:
-            if proj.pos.y > self.window.size[1]:
-                projs_to_remove.append(proj)
-                continue
-            for obstacle in self.obstacles:
-                if proj.rect.colliderect(obstacle.rect):
-                    obstacle.health -= proj.damage
-                    projs_to_remove.append(proj)
-                    self.audio.play_sound(self.sfx["explosion"])
-
-        for proj in projs_to_remove:
-            self.projectiles.active_projectiles.remove(proj)
-            proj.delete()
+    def update_projectiles(self, dt: float) -> None:
+        self.projectiles.update(self.player, dt)
+        projs, targets = self.projectiles.step(self.time, self.obstacle_grid)
+        if projs.size:
+            # An obstacle hit by several projectiles takes all their damage.
+            np.subtract.at(
+                self.render_groups["default"].entities.health,
+                self.obstacle_slots[targets],
+                self.projectiles.damages[projs],
+            )
+            self.play_sound("explosion")
+
+    def update_loading_text(self) -> None:
+        if self.intro_panel_active and self.asset_progress < 1.0:
+            self.loading_text.visible = True
+            self.loading_text.update()
+        elif self.loading_text.visible:
+            self.loading_text.visible = False
+            self.loading_text.update()
+
+    def update_stats_overlay(self) -> None:
+        # The overlay's lines reach into the centered panels, so they are
+        # hidden while the power-ups or game over panel is shown.
+        panel_shown = self.power_ups_panel_active or self.game_over_panel_active
+        if self.stats_overlay_active and not panel_shown:
+            for text in self.stats_texts:
+                text.visible = True
+                text.update()
+        elif self.stats_texts[0].visible:
+            for text in self.stats_texts:
+                text.visible = False
+                text.update()
 
     def update_ui_texts(self):
-        # self.fps_text.update()
         self.level_text.update()
         self.score_text.update()
         self.health_text.update()
@@ -312,53 +439,56 @@ class Scene:
         if self.money >= 50:
             self.get_upgrade_text.update()
 
-    def update_bg(self, bg_1: Sprite, bg_2: Sprite, speed: int) -> None:
+    def update_bg(self, bg_1: Sprite, bg_2: Sprite, speed: float, dt: float) -> None:
         window_height = self.window.size[1]
-        delta = speed * self.window.frame_time
+        delta = speed * dt
 
-        bg_1.pos.y -= delta
-        bg_2.pos.y -= delta
+        pos_1, pos_2 = bg_1.pos, bg_2.pos
+        pos_1.y -= delta
+        pos_2.y -= delta
 
-        if bg_1.pos.y < -window_height:
-            bg_1.pos.y += 2 * window_height
-        if bg_2.pos.y < -window_height:
-            bg_2.pos.y += 2 * window_height
+        if pos_1.y < -window_height:
+            pos_1.y += 2 * window_height
+        if pos_2.y < -window_height:
+            pos_2.y += 2 * window_height
 
-        if abs(abs(bg_1.pos.y - bg_2.pos.y) - window_height) > 1:
-            if bg_1.pos.y < bg_2.pos.y:
-                bg_2.pos.y = bg_1.pos.y + window_height
+        if abs(abs(pos_1.y - pos_2.y) - window_height) > 1:
+            if pos_1.y < pos_2.y:
+                pos_2.y = pos_1.y + window_height
             else:
-                bg_1.pos.y = bg_2.pos.y + window_height
+                pos_1.y = pos_2.y + window_height
+
+        bg_1.set_pos(pos_1)
+        bg_2.set_pos(pos_2)
 
-        bg_1.set_pos(bg_1.pos)
-        bg_2.set_pos(bg_2.pos)
+    def update_datastream_scroll(self, dt: float) -> None:
+        delta = self.datastream_speed * dt / self.window.size[1]
+        self.datastream_scroll = (self.datastream_scroll + delta) % 1
 
     def update_obstacles(self) -> None:
-        obs_to_remove: list[Sprite] = []
-        for obstacle in self.obstacles:
-            obstacle.rot = 10 * np.sin(self.time * 10) if obstacle.rot < 10 else 10
-
-            if obstacle.health <= 0:
-                obs_to_remove.append(obstacle)
-                obstacle.delete()
-                self.enemies_killed += 1
-                self.score += 10
-                self.money += 10
-                continue
-
-            delta = obstacle.speed * self.window.frame_time
-            obstacle.set_pos((obstacle.pos.x, obstacle.pos.y - delta))
-            if obstacle.pos.y < -obstacle.size[1]:
-                obs_to_remove.append(obstacle)
-                obstacle.delete()
-                self.network_breaches += 1
-                self.player.health -= 5
-                self.audio.play_sound(self.sfx["hurt"])
-
-        for obstacle in obs_to_remove:
-            self.obstacles.remove(obstacle)
-            if obstacle in self.collided_obstacles:
-                self.collided_obstacles.remove(obstacle)
+        if not self.obstacles:
+            return
+        # Obstacles are tested as whole columns of the default group's arrays;
+        # only the few removed this frame are touched one by one.
+        group = self.render_groups["default"]
+        slots = np.fromiter(self.obstacles, dtype=np.int64, count=len(self.obstacles))
+        dead = group.entities.health[slots] <= 0
+        y = group.positions_at(self.time, slots)[:, 1]
+        breached = ~dead & (y < -group.instance_data[slots, SIZE_COLUMNS[1]])
+        for slot in slots[dead | breached].tolist():
+            obstacle = self.obstacles.pop(slot)
+            obstacle.delete()
+            self.collided_obstacles.discard(obstacle)
+
+        num_dead = int(np.count_nonzero(dead))
+        self.enemies_killed += num_dead
+        self.score += 10 * num_dead
+        self.money += 10 * num_dead
+        num_breached = int(np.count_nonzero(breached))
+        if num_breached:
+            self.network_breaches += num_breached
+            self.player.health -= 5 * num_breached
+            self.play_sound("hurt")
 
     def update_player_pos(self) -> None:
         player_size_x, player_size_y = self.player.size
@@ -376,33 +506,53 @@ class Scene:
             pos.y = window_size_y - player_size_y
         self.player.set_pos(pos)
 
+    def update_obstacle_grid(self) -> None:
+        group = self.render_groups["default"]
+        slots = np.fromiter(self.obstacles, dtype=np.int64, count=len(self.obstacles))
+        boxes = np.empty((slots.size, 4))
+        boxes[:, :2] = group.positions_at(self.time, slots)
+        boxes[:, 2:] = group.instance_data[slots][:, SIZE_COLUMNS]
+        self.obstacle_grid.insert(boxes)
+        self.obstacle_slots = slots
+
     def update_player_collisions(self) -> None:
-        for obstacle in self.obstacles:
-            if obstacle in self.collided_obstacles:
-                continue
-            if self.player.rect.colliderect(obstacle.rect):
-                self.collided_obstacles.append(obstacle)
+        player_box = np.array([[*self.player.pos, *self.player.size]])
+        _, hits = self.obstacle_grid.query(player_box)
+        for slot in self.obstacle_slots[hits].tolist():
+            obstacle = self.obstacles[slot]
+            if obstacle not in self.collided_obstacles:
+                self.collided_obstacles.add(obstacle)
                 self.player.health -= 10
-                self.audio.play_sound(self.sfx["hurt"])
+                self.play_sound("hurt")
 
-    def update_timers(self):
+    def update_timers(self, dt: float):
         for timer in self.timers.values():
-            timer.update(self.window.frame_time)
+            timer.update(dt)
 
     def create_entities(self) -> None:
         self.create_player()
         self.create_backgrounds()
         self.create_ui_panel()
         self.create_ui_texts()
+        self.create_stats_texts()
         self.create_power_ups_panel()
         self.create_power_up_buttons()
         self.create_all_power_up_texts()
         self.create_intro_panel()
         self.create_game_over_panel()
         self.create_game_over_texts()
+        self.interpolated = [
+            self.player,
+            self.left_circuit_board_bg_1,
+            self.left_circuit_board_bg_2,
+            self.right_circuit_board_bg_1,
+            self.right_circuit_board_bg_2,
+        ]
+        self.previous_positions = [sprite.pos for sprite in self.interpolated]
+        self.step_positions = []
 
     def create_player(self) -> None:
-        player_img_size = self.renderer.textures.robot_img_size
+        player_img_size = self.textures.robot_img_size
         player_scale = 0.15
         player_size = (
             player_img_size[0] * player_scale,
@@ -413,77 +563,74 @@ class Scene:
             self.ui_panel_height + player_size[1],
         )
         self.player = Sprite(
-            render_group=self.render_groups["player"],
+            render_group=self.render_groups["default"],
             pos=player_pos,
             size=player_size,
-            tex_idx=0,
+            region=self.atlas["robot"],
             depth=3,
             speed=500,
         )
 
     def create_backgrounds(self) -> None:
-        self.datastream_bg_1 = Sprite(
-            render_group=self.render_groups["datastream"],
-            pos=(0, 0),
-            size=self.window.size,
-            depth=1,
-        )
-        self.datastream_bg_2 = Sprite(
-            render_group=self.render_groups["datastream"],
-            pos=(0, self.window.size[1]),
-            size=self.window.size,
-            depth=1,
-        )
+        self.datastream_scroll = 0.0
+        self.previous_scroll = 0.0
+        self.renderer.background.scroll = 0.0
         self.left_circuit_board_bg_1 = Sprite(
-            render_group=self.render_groups["circuit_board"],
+            render_group=self.render_groups["default"],
             pos=(0, 0),
             size=(self.circuit_board_width, self.window.size[1]),
-            tex_idx=0,
+            region=self.atlas["circuit_board"],
             depth=2,
         )
         self.left_circuit_board_bg_2 = Sprite(
-            render_group=self.render_groups["circuit_board"],
+            render_group=self.render_groups["default"],
             pos=(0, self.window.size[1]),
             size=(self.circuit_board_width, self.window.size[1]),
-            tex_idx=2,
+            region=self.atlas["circuit_board"],
+            flip=(False, True),
             depth=2,
         )
         self.right_circuit_board_bg_1 = Sprite(
-            render_group=self.render_groups["circuit_board"],
+            render_group=self.render_groups["default"],
             pos=(self.window.size[0] - self.circuit_board_width, 0),
             size=(self.circuit_board_width, self.window.size[1]),
-            tex_idx=1,
+            region=self.atlas["circuit_board"],
+            flip=(True, False),
             depth=2,
         )
         self.right_circuit_board_bg_2 = Sprite(
-            render_group=self.render_groups["circuit_board"],
+            render_group=self.render_groups["default"],
             pos=(self.window.size[0] - self.circuit_board_width, self.window.size[1]),
             size=(self.circuit_board_width, self.window.size[1]),
-            tex_idx=3,
+            region=self.atlas["circuit_board"],
+            flip=(True, True),
             depth=2,
         )
 
     def create_ui_panel(self) -> None:
         self.ui_panel = Sprite(
-            render_group=self.render_groups["ui_panel"],
+            render_group=self.render_groups["translucent"],
             pos=(0, 0),
             size=(self.window.size[0], self.ui_panel_height),
-            tex_idx=0,
+            region=self.atlas["ui_panel"],
             depth=9,
         )
 
     def create_game_over_texts(self) -> None:
         panel_pos = self.game_over_panel_pos
-        text_callbacks = [
-            lambda: "GAME OVER!",
-            lambda: f"Enemies Killed: {self.enemies_killed}",
-            lambda: f"Network Breaches: {self.network_breaches}",
-            lambda: f"Time Survived: {self.time:.0f} seconds",
-            lambda: f"Money Remaining: {self.money:.0f}",
-            lambda: f"Score: {self.score:.0f}",
-            lambda: f"Bonus Score (money + time): {self.bonus_score:.0f}",
-            lambda: f"Final Score: {self.final_score:.0f}",
-            lambda: "Press SPACE to restart",
+        text_bindings: list[TextBinding] = [
+            ("GAME OVER!", str),
+            (lambda: self.enemies_killed, lambda n: f"Enemies Killed: {n}"),
+            (lambda: self.network_breaches, lambda n: f"Network Breaches: {n}"),
+            (lambda: round(self.time), lambda t: f"Time Survived: {t} seconds"),
+            (lambda: round(self.money), lambda m: f"Money Remaining: {m}"),
+            (lambda: round(self.score), lambda s: f"Score: {s}"),
+            (
+                lambda: round(self.bonus_score),
+                lambda s: f"Bonus Score (money + time): {s}",
+            ),
+            (lambda: round(self.final_score), lambda s: f"Final Score: {s}"),
+            ("Press SPACE to restart", str),
         ]
         text_offsets = (
             (10, 10),
@@ -498,47 +645,88 @@ class Scene:
         )
 
         self.game_over_texts: list[TextLine] = []
-        for idx, callback in enumerate(text_callbacks):
+        for idx, (source, fmt) in enumerate(text_bindings):
             pos = (
                 panel_pos[0] + text_offsets[idx][0],
                 panel_pos[1] + text_offsets[idx][1],
             )
-            self.game_over_texts.append(self.create_text_line(pos, callback))
+            self.game_over_texts.append(self.create_text_line(pos, source, fmt))
 
     def create_ui_texts(self) -> None:
-        # self.fps_text = self.create_text_line(
-        #     pos=(10, 10),
-        #     callback=lambda: f"FPS: {self.renderer.avg_fps:.1f}",
-        # )
         self.level_text = self.create_text_line(
             pos=(10, 10),
-            callback=lambda: f"Level: {self.current_level if self.current_level < len(LEVELS) else 'MAX'}",
+            source=lambda: self.current_level,
+            fmt=lambda level: f"Level: {level if level < len(LEVELS) else 'MAX'}",
         )
         self.score_text = self.create_text_line(
             pos=(10, 48),
-            callback=lambda: f"Score: {self.score:.0f}",
+            source=lambda: round(self.score),
+            fmt=lambda score: f"Score: {score}",
         )
         self.money_text = self.create_text_line(
             pos=(250, 48),
-            callback=lambda: f"Money: ${self.money:.0f}",
+            source=lambda: round(self.money),
+            fmt=lambda money: f"Money: ${money}",
         )
         self.health_text = self.create_text_line(
             pos=(250, 10),
-            callback=lambda: f"Health: {self.player.health:.0f}",
+            source=lambda: round(self.player.health),
+            fmt=lambda health: f"Health: {health}",
         )
         self.get_upgrade_text = self.create_text_line(
             pos=(self.window.size[0] // 2 - 250, 10),
-            callback=lambda: f"Get Upgrade! (Press F)",
+            source="Get Upgrade! (Press F)",
         )
         self.reload_speed_text = self.create_text_line(
             pos=(self.window.size[0] - 450, 10),
-            callback=lambda: f"Reload Speed: {1 / self.projectiles.cd_duration:.2f}",
+            source=lambda: self.projectiles.cd_duration,
+            fmt=lambda duration: f"Reload Speed: {1 / duration:.2f}",
         )
         self.move_speed_text = self.create_text_line(
             pos=(self.window.size[0] - 450, 48),
-            callback=lambda: f"Move Speed: {self.player.speed / 100:.2f}",
+            source=lambda: self.player.speed,
+            fmt=lambda speed: f"Move Speed: {speed / 100:.2f}",
         )
 
+    def create_stats_texts(self) -> None:
+        stats = self.renderer.stats
+        text_bindings: list[TextBinding] = [
+            (lambda: round(self.renderer.avg_fps, 1), lambda fps: f"FPS: {fps}"),
+            (
+                lambda: tuple(round(t * 1000, 1) for t in stats.frame_time_percentiles),
+                lambda times: f"Frame p50/95/99: {'/'.join(map(str, times))} ms",
+            ),
+            (
+                lambda: round(stats.update_time * 1000, 2),
+                lambda ms: f"CPU update: {ms:.2f} ms",
+            ),
+            (
+                lambda: round(stats.render_time * 1000, 2),
+                lambda ms: f"CPU render: {ms:.2f} ms",
+            ),
+            (lambda: stats.draw_calls, lambda n: f"Draw calls: {n}"),
+            (
+                lambda: tuple(stats.instances.items()),
+                lambda items: (
+                    "Instances: " + " ".join(f"{name}={count}" for name, count in items)
+                ),
+            ),
+            (lambda: stats.culled, lambda n: f"Culled: {n}"),
+            (
+                lambda: round(stats.bytes_uploaded / 1024, 1),
+                lambda kib: f"Uploaded: {kib} KiB",
+            ),
+            (lambda: stats.pipeline_rebuilds, lambda n: f"Pipeline rebuilds: {n}"),
+            (lambda: stats.text_lines_updated, lambda n: f"Text lines updated: {n}"),
+        ]
+        self.stats_texts: list[TextLine] = []
+        for idx, (source, fmt) in enumerate(text_bindings):
+            pos = (
+                self.circuit_board_width + 10,
+                int(self.ui_panel_height) + 10 + idx * 38,
+            )
+            self.stats_texts.append(self.create_text_line(pos, source, fmt))
+
     def create_power_ups_panel(self) -> None:
         self.power_ups_panel_size = (self.window.size[0] // 2, self.window.size[1] // 2)
         self.power_ups_panel_pos = (
@@ -549,7 +737,8 @@ class Scene:
             render_group=self.render_groups["default"],
             pos=self.power_ups_panel_pos,
             size=self.power_ups_panel_size,
-            tex_idx=2,
+            region=self.atlas["button"],
+            tint=BUTTON_TINTS["gray"],
             depth=9,
         )
 
@@ -572,23 +761,32 @@ class Scene:
         self.center_power_up_button = Sprite(
             render_group=self.render_groups["default"],
             pos=self.center_power_up_button_pos,
-            size=(0, 0),
+            size=self.power_up_button_size,
+            region=self.atlas["button"],
+            tint=BUTTON_TINTS["red"],
             depth=10,
+            visible=False,
             cost=50,
         )
         self.left_power_up_button = Sprite(
             render_group=self.render_groups["default"],
             pos=self.left_power_up_button_pos,
-            size=(0, 0),
+            size=self.power_up_button_size,
+            region=self.atlas["button"],
+            tint=BUTTON_TINTS["red"],
             depth=10,
+            visible=False,
             cost=50,
             name="move_speed",
         )
         self.right_power_up_button = Sprite(
             render_group=self.render_groups["default"],
             pos=self.right_power_up_button_pos,
-            size=(0, 0),
+            size=self.power_up_button_size,
+            region=self.atlas["button"],
+            tint=BUTTON_TINTS["red"],
             depth=10,
+            visible=False,
             cost=100,
         )
         self.power_up_buttons = [
@@ -599,11 +797,10 @@ class Scene:
 
     def create_all_power_up_texts(self) -> None:
         self.power_up_texts: list[TextLine] = []
-        x_offsets = [(35, 35, 35, 25, -2), (35, 35, 15, 25, -2), (15, 35, 15, 25, -2)]
         texts = [
-            ("-$50", "+10%", "Move", "Speed", "Press[1]"),
-            ("-$50", "+10%", "Reload", "Speed", "Press[2]"),
-            ("-$100", "Full", "Health", "Regen", "Press[3]"),
+            ("-$50", "+10%\nMove\nSpeed", "Press[1]"),
+            ("-$50", "+10%\nReload\nSpeed", "Press[2]"),
+            ("-$100", "Full\nHealth\nRegen", "Press[3]"),
         ]
         button_positions = [
             self.left_power_up_button_pos,
@@ -612,71 +809,68 @@ class Scene:
         ]
         for idx, button_pos in enumerate(button_positions):
             self.power_up_texts.extend(
-                self.create_power_up_button_texts(
-                    button_pos, texts[idx], x_offsets[idx]
-                )
+                self.create_power_up_button_texts(button_pos, texts[idx])
             )
 
     def create_power_up_button_texts(
         self,
         button_pos: tuple[int, int],
-        text_contents: tuple[str, str, str, str, str],
-        text_x_offsets: tuple[int, int, int, int, int],
+        text_contents: tuple[str, str, str],
     ) -> list[TextLine]:
-        y_offsets = (-50, 10, 50, 90, 160)
-
-        line_1_text_pos = (
-            button_pos[0] + text_x_offsets[0],
-            button_pos[1] + y_offsets[0],
-        )
-        line_2_text_pos = (
-            button_pos[0] + text_x_offsets[1],
-            button_pos[1] + y_offsets[1],
-        )
-        line_3_text_pos = (
-            button_pos[0] + text_x_offsets[2],
-            button_pos[1] + y_offsets[2],
-        )
-        line_4_text_pos = (
-            button_pos[0] + text_x_offsets[3],
-            button_pos[1] + y_offsets[3],
-        )
-        line_5_text_pos = (
-            button_pos[0] + text_x_offsets[4],
-            button_pos[1] + y_offsets[4],
-        )
-
-        lines = [
-            self.create_text_line(line_1_text_pos, lambda: text_contents[0]),
-            self.create_text_line(line_2_text_pos, lambda: text_contents[1]),
-            self.create_text_line(line_3_text_pos, lambda: text_contents[2]),
-            self.create_text_line(line_4_text_pos, lambda: text_contents[3]),
-            self.create_text_line(line_5_text_pos, lambda: text_contents[4]),
+        center_x = button_pos[0] + self.power_up_button_size[0] // 2
+        y_offsets = (-50, 10, 160)
+        return [
+            self.create_text_line(
+                (center_x, button_pos[1] + y_offset),
+                text,
+                align="center",
+                line_height=40,
+            )
+            for text, y_offset in zip(text_contents, y_offsets)
         ]
-        return lines
 
-    def create_text_line(self, pos: tuple[int, int], callback: Callable) -> TextLine:
-        return TextLine(
-            callback=callback,
+    def create_text_line(
+        self,
+        pos: tuple[int, int],
+        source: str | Callable[[], Any],
+        fmt: Callable[[Any], str] = str,
+        align: Literal["left", "center", "right"] = "left",
+        line_height: float | None = None,
+    ) -> TextLine:
+        text = TextLine(
+            source=source,
+            fmt=fmt,
             render_group=self.render_groups["font"],
-            font_size=self.renderer.textures.font_size,
-            font_idx_map=self.renderer.textures.font_idx_map,
+            font_size=self.textures.font_size,
+            glyph_table=self.textures.font_glyph_table,
             pos=pos,
             depth=11,
+            align=align,
+            line_height=line_height,
         )
+        self.text_lines.append(text)
+        return text
 
     def create_intro_panel(self) -> None:
         pos = (
-            self.window.size[0] // 2 - self.renderer.textures.intro_panel_size[0] // 2,
-            self.window.size[1] // 2 - self.renderer.textures.intro_panel_size[1] // 2,
+            self.window.size[0] // 2 - self.textures.intro_panel_size[0] // 2,
+            self.window.size[1] // 2 - self.textures.intro_panel_size[1] // 2,
         )
         self.intro_panel = Sprite(
-            render_group=self.render_groups["intro_panel"],
+            render_group=self.render_groups["translucent"],
             pos=pos,
-            size=self.renderer.textures.intro_panel_size,
-            tex_idx=4,
+            size=self.textures.intro_panel_size,
+            region=self.atlas["intro_panel"],
             depth=12,
         )
+        # Below the panel, clear of the panel's own text.
+        self.loading_text = self.create_text_line(
+            (self.window.size[0] // 2, pos[1] + self.textures.intro_panel_size[1] + 10),
+            lambda: round(self.asset_progress * 100),
+            lambda percent: f"Loading assets... {percent}%",
+            align="center",
+        )
+        self.loading_text.visible = False
 
     def create_game_over_panel(self) -> None:
         self.game_over_panel_size = (self.window.size[0] // 2, self.window.size[1] // 2)
@@ -685,10 +879,10 @@ class Scene:
             self.window.size[1] // 2 - self.game_over_panel_size[1] // 2,
         )
         self.game_over_panel = Sprite(
-            render_group=self.render_groups["ui_panel"],
+            render_group=self.render_groups["translucent"],
             pos=self.game_over_panel_pos,
             size=self.game_over_panel_size,
-            tex_idx=0,
+            region=self.atlas["ui_panel"],
             depth=9,
         )
 
@@ -703,28 +897,27 @@ class Scene:
         self.timers[name] = Timer(name, duration, num_repeats, callback, callback_args)
 
     def add_obstacle(self) -> None:
-        obstacle_id = random.choice(
-            list(self.renderer.textures.obstacle_textures.keys())
-        )
-        size = self.renderer.textures.obstacle_sizes[obstacle_id]
+        obstacle_id = self.random.choice(list(self.textures.obstacle_sizes.keys()))
+        size = self.textures.obstacle_sizes[obstacle_id]
         pos = (
-            random.randint(
+            self.random.randint(
                 self.circuit_board_width,
                 self.window.size[0] - self.circuit_board_width - size[0],
             ),
             self.window.size[1],
         )
-        speed = random.randint(*self.obstacles_speed_range)
-        self.obstacles.append(
-            Sprite(
-                render_group=self.render_groups[obstacle_id],
-                pos=pos,
-                size=size,
-                depth=4,
-                speed=speed,
-                health=20,
-            )
-        )
+        speed = self.random.randint(*self.obstacles_speed_range)
+        obstacle = Sprite(
+            render_group=self.render_groups["default"],
+            pos=pos,
+            size=size,
+            region=self.atlas[obstacle_id],
+            depth=4,
+            speed=speed,
+            health=20,
+        )
+        obstacle.launch((0, -speed), self.time, wobble=10)
+        self.obstacles[obstacle.slot] = obstacle
 
     def increment_level(self) -> None:
         if self.current_level < len(LEVELS):
@@ -0,0 +1,96 @@
+import asyncio
+from dataclasses import dataclass
+from typing import Callable, Iterable, Sequence
+
+from src.app import App
+from src.recording import Recorder, Recording, ReplayVerifier
+from src.rendering.null_renderer import NullRenderer
+from src.scene import Scene
+from src.window.audio.null_audio import NullAudio
+from src.window.inputs_map import Inputs
+from src.window.replay_window import ReplayWindow
+from src.window.simulation_window import SimulationWindow
+
+
+@dataclass
+class SimulationResult:
+    scene: Scene
+    frames: int
+    elapsed: float
+
+    @property
+    def fps(self) -> float:
+        return self.frames / self.elapsed if self.elapsed > 0 else 0.0
+
+
+@dataclass
+class ReplayResult(SimulationResult):
+    # First frame whose state differs from the recording, if any.
+    mismatch: int | None = None
+
+
+def scripted_inputs(
+    keys: Sequence[Iterable[Inputs]],
+) -> Callable[[int], Iterable[Inputs]]:
+    def inputs(frame: int) -> Iterable[Inputs]:
+        return keys[frame] if frame < len(keys) else ()
+
+    return inputs
+
+
+def simulate(
+    frames: int,
+    inputs: Callable[[int], Iterable[Inputs]]
+    | Sequence[Iterable[Inputs]]
+    | None = None,
+    frame_time: float = 1 / 60,
+    step_rate: float = 120.0,
+    size: tuple[int, int] = (1600, 900),
+    seed: int | None = None,
+    recorder: Recorder | None = None,
+) -> SimulationResult:
+    """Runs the game logic for `frames` frames without a window, GL or audio.
+
+    `inputs` gives the keys held down in each frame, either as a function of
+    the frame number or as a sequence with one entry per frame (frames past
+    its end hold no keys). Frames advance a synthetic clock by `frame_time`
+    without waiting, so `elapsed` (which excludes loading) measures the
+    simulation alone. `seed` and `recorder` are passed on to the `App`.
+    """
+    if inputs is not None and not callable(inputs):
+        inputs = scripted_inputs(inputs)
+    window = SimulationWindow(*size, frames, frame_time, inputs)
+    app = App(
+        window,
+        NullAudio(),
+        wait_for_assets=True,
+        step_rate=step_rate,
+        renderer=NullRenderer(window),
+        seed=seed,
+        recorder=recorder,
+    )
+    asyncio.run(app.start())
+    assert app.scene is not None
+    return SimulationResult(app.scene, window.frame, window.elapsed)
+
+
+def run_replay(recording: Recording) -> ReplayResult:
+    """Replays a recorded run as fast as possible and checks every frame.
+
+    The result's `mismatch` is the first frame whose state checksum differs
+    from the recorded one, or None if the replay reproduced the run.
+    """
+    window = ReplayWindow(recording)
+    verifier = ReplayVerifier(recording)
+    app = App(
+        window,
+        NullAudio(),
+        wait_for_assets=True,
+        step_rate=recording.step_rate,
+        renderer=NullRenderer(window),
+        seed=recording.seed,
+        recorder=verifier,
+    )
+    asyncio.run(app.start())
+    assert app.scene is not None
+    return ReplayResult(app.scene, window.frame, window.elapsed, verifier.mismatch)
@@ -0,0 +1,17 @@
+from src.window.audio.base import Audio
+
+
+class NullAudio(Audio[None]):
+    """Audio backend that loads and plays nothing, for headless runs."""
+
+    def load_sound(self, path: str) -> None:
+        return None
+
+    def load_music(self, path: str) -> None:
+        return None
+
+    def play_sound(self, sound: None) -> None:
+        pass
+
+    def play_music(self, sound: None) -> None:
+        pass
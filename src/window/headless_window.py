@@ -0,0 +1,90 @@
+import os
+import sys
+from typing import Callable, Iterable
+
+import numpy as np
+import pygame
+import zengl
+
+from src.window.inputs_map import Inputs
+from src.window.simulation_window import SimulationWindow
+
+
+class HeadlessGLLoader:
+    """Loads OpenGL functions from a standalone context with no window.
+
+    Linux uses EGL so it also works without an X display (e.g. with Mesa's
+    software rasterizer); other platforms use the platform default backend.
+    """
+
+    def __init__(self) -> None:
+        import glcontext  # type: ignore
+
+        if sys.platform.startswith("linux"):
+            backend = glcontext.get_backend_by_name("egl")
+        else:
+            backend = glcontext.default_backend()
+        self.context = backend(glversion=330, mode="standalone")
+
+    # zengl's ContextLoader stub declares `name` without `self`, which only a
+    # default value reconciles with this method.
+    def load_opengl_function(self, name: str = "") -> int:
+        return self.context.load(name)
+
+
+class HeadlessWindow(SimulationWindow):
+    """Window stand-in that renders offscreen as fast as possible.
+
+    Frames advance a synthetic clock by a fixed `frame_time`, so runs are
+    repeatable and not paced by the display. `framebuffer` (usually the
+    renderer's fbo) is read back for the frames listed in `capture_frames` and
+    written to `capture_dir` as PNG or `.npy` files. `inputs` scripts the keys
+    held down in each frame, as for `SimulationWindow`.
+    """
+
+    def __init__(
+        self,
+        width: int,
+        height: int,
+        num_frames: int = 600,
+        frame_time: float = 1 / 60,
+        capture_frames: Iterable[int] = (),
+        capture_dir: str = "captures",
+        capture_format: str = "png",
+        inputs: Callable[[int], Iterable[Inputs]] | None = None,
+    ) -> None:
+        super().__init__(width, height, num_frames, frame_time, inputs)
+        pygame.init()
+        zengl.init(HeadlessGLLoader())
+        self.capture_frames = set(capture_frames)
+        self.capture_dir = capture_dir
+        self.capture_format = capture_format
+        self.framebuffer: zengl.Image | None = None
+
+    def read_frame(self) -> np.ndarray:
+        """Returns the framebuffer as a top-down (height, width, 4) uint8 array."""
+        assert self.framebuffer is not None
+        width, height = self.framebuffer.size
+        pixels = np.frombuffer(self.framebuffer.read(), dtype=np.uint8)
+        return pixels.reshape(height, width, 4)[::-1]
+
+    def save_frame(self, path: str) -> None:
+        pixels = self.read_frame()
+        if path.endswith(".npy"):
+            np.save(path, pixels)
+        else:
+            surf = pygame.image.frombuffer(pixels.tobytes(), self.size, "RGBA")
+            pygame.image.save(surf, path)
+
+    def end_frame(self) -> None:
+        if self.frame in self.capture_frames:
+            self.save_frame(
+                os.path.join(
+                    self.capture_dir, f"frame_{self.frame}.{self.capture_format}"
+                )
+            )
+
+    async def on_render(self, render: Callable[[], None]) -> None:
+        if self.capture_frames:
+            os.makedirs(self.capture_dir, exist_ok=True)
+        await super().on_render(render)
@@ -0,0 +1,41 @@
+import numpy as np
+
+from src.recording import INPUT_BITS, Recording
+from src.window.inputs_map import Inputs
+from src.window.simulation_window import SimulationWindow
+
+
+class ReplayWindow(SimulationWindow):
+    """Plays back a recording's frame times and keys, uncapped.
+
+    Frames run as fast as the game updates, but each one reports the frame
+    time it had when recorded, so the game takes the same steps.
+    """
+
+    def __init__(self, recording: Recording) -> None:
+        frames = recording.frames
+        super().__init__(*recording.size, len(frames))
+        self.recording = recording
+        self.start_times = np.concatenate(([0.0], np.cumsum(frames["dt"])))
+
+    def _bit_set(self, field: str, frame: int, key: Inputs) -> bool:
+        if not 0 <= frame < self.num_frames:
+            return False
+        return bool(self.recording.frames[field][frame] & INPUT_BITS.get(key, 0))
+
+    def key_down(self, key: Inputs) -> bool:
+        return self._bit_set("down", self.frame, key)
+
+    def key_pressed(self, key: Inputs) -> bool:
+        return self._bit_set("pressed", self.frame, key)
+
+    def key_released(self, key: Inputs) -> bool:
+        return not self.key_down(key) and self._bit_set("down", self.frame - 1, key)
+
+    @property
+    def frame_time(self) -> float:
+        return float(self.recording.frames["dt"][self.frame])
+
+    @property
+    def time(self) -> float:
+        return float(self.start_times[self.frame])
@@ -0,0 +1,76 @@
+import time
+from typing import Callable, Iterable
+
+from src.window.inputs_map import Inputs
+
+
+class SimulationWindow:
+    """Window stand-in with a synthetic clock and scripted input.
+
+    It opens no display and needs no GL context. Frames advance the clock by
+    a fixed `frame_time` as fast as they are rendered, and `inputs`, if
+    given, returns the keys held down in each frame number.
+    """
+
+    def __init__(
+        self,
+        width: int,
+        height: int,
+        num_frames: int = 600,
+        frame_time: float = 1 / 60,
+        inputs: Callable[[int], Iterable[Inputs]] | None = None,
+    ) -> None:
+        self.size = width, height
+        self.num_frames = num_frames
+        self.dt = frame_time
+        self.inputs = inputs
+        self.frame = 0
+        self.keys: set[Inputs] = set()
+        self.prev_keys: set[Inputs] = set()
+        self.mouse_pos = width // 2, height // 2
+        self.prev_mouse = self.mouse_pos
+        self.elapsed = 0.0
+        self.running = True
+
+    def key_down(self, key: Inputs) -> bool:
+        return key in self.keys
+
+    def key_pressed(self, key: Inputs) -> bool:
+        return key in self.keys and key not in self.prev_keys
+
+    def key_released(self, key: Inputs) -> bool:
+        return key not in self.keys and key in self.prev_keys
+
+    @property
+    def frame_time(self) -> float:
+        return self.dt
+
+    @property
+    def time(self) -> float:
+        return self.frame * self.dt
+
+    @property
+    def mouse(self) -> tuple[int, int]:
+        return self.mouse_pos
+
+    @property
+    def mouse_delta(self) -> tuple[int, int]:
+        return (
+            self.mouse[0] - self.prev_mouse[0],
+            self.mouse[1] - self.prev_mouse[1],
+        )
+
+    def end_frame(self) -> None:
+        """Called after each rendered frame, before the clock advances."""
+
+    async def on_render(self, render: Callable[[], None]) -> None:
+        start = time.perf_counter()
+        while self.running and self.frame < self.num_frames:
+            if self.inputs is not None:
+                self.keys = set(self.inputs(self.frame))
+            render()
+            self.end_frame()
+            self.prev_keys = set(self.keys)
+            self.prev_mouse = self.mouse_pos
+            self.frame += 1
+        self.elapsed = time.perf_counter() - start